@@ -40,10 +40,21 @@ class MemoryEnabledOrchestrator:
         print("Phase 2: Execution...")
         results = []
         
+        # One batched search covers the remaining steps instead of a round trip per step.
+        # Saving an agent output makes it stale, so the steps after it are searched again
+        # and can see that output.
+        step_memories = [[] for _ in steps]
+        refresh = bool(self.memory and steps)
+        
         for i, step in enumerate(steps, 1):
             agent_name = step.get("agent")
             task = step.get("task")
             
+            if refresh:
+                await self.memory.flush_vectors()
+                step_memories[i - 1:] = await self.memory.vector.query_many([s.get("task") or "" for s in steps[i - 1:]])
+                refresh = False
+            
             print(f"\n[{i}/{len(steps)}] {agent_name}: {task}")
             log_action("Orchestrator", f"Executing step {i}: {agent_name} -> {task}")
             
@@ -57,7 +68,8 @@ class MemoryEnabledOrchestrator:
                 previous_results=results,
                 original_goal=user_goal,
                 memory_context=memory_context,
-                agent_name=agent_name
+                agent_name=agent_name,
+                task_memories=step_memories[i - 1]
             )
             
             agent = self.agents[agent_name]
@@ -77,6 +89,7 @@ class MemoryEnabledOrchestrator:
                     importance=6,
                     memory_type="episodic"
                 )
+                refresh = True
                     
         print(f"\n{'='*70}")
         print("Execution Completed")
@@ -139,7 +152,8 @@ Please create a plan considering the above context."""
         previous_results: list,
         original_goal: str,
         memory_context: str,
-        agent_name: str
+        agent_name: str,
+        task_memories: list
     ) -> str:
         
         context_parts = []
@@ -147,14 +161,12 @@ Please create a plan considering the above context."""
         if memory_context:
             context_parts.append(memory_context)
         
-        if self.memory:
-            task_memories = await self.memory.vector.query(task)
-            if task_memories:
-                existing_content = [line for line in memory_context.split('\n') if line.strip()]
-                task_context = [f"  • {mem.content}" for mem in task_memories[:3]
-                                if not any(mem.content in existing for existing in existing_content)]
-                if task_context:
-                    context_parts.append("\n=== RELEVANT TO THIS TASK ===\n" + "\n".join(task_context))
+        if task_memories:
+            existing_content = [line for line in memory_context.split('\n') if line.strip()]
+            task_context = [f"  • {mem.content}" for mem in task_memories[:3]
+                            if not any(mem.content in existing for existing in existing_content)]
+            if task_context:
+                context_parts.append("\n=== RELEVANT TO THIS TASK ===\n" + "\n".join(task_context))
         
         context_parts.append(f"\n=== ORIGINAL GOAL ===\n{original_goal}")
         context_parts.append(f"\n=== TASK ===\n{task}")
@@ -202,7 +214,13 @@ Please create a plan considering the above context."""
     async def get_memory_stats(self) -> dict:
         if not self.memory:
             return {"status": "No memory system attached"}
-        return self.memory.get_memory_stats()
+        await self.memory.flush()
+        return await self.memory.get_memory_stats()
+    
+    async def get_memory_health(self) -> dict:
+        if not self.memory:
+            return {"status": "No memory system attached"}
+        return await self.memory.health()
     
     async def clear_session_memory(self) -> None:
         if self.memory:
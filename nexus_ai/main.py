@@ -10,6 +10,8 @@ from nexus_ai.agents.planner import PlannerAgent
 from nexus_ai.agents.coder import CoderAgent
 from nexus_ai.agents.orchestrator import MemoryEnabledOrchestrator
 from nexus_ai.memory.memory_agent import AgentMemorySystem
+from nexus_ai.memory.embedding_executor import EmbeddingExecutor
+from nexus_ai.memory.encoder_registry import warm_up
 import os
 from dotenv import load_dotenv
 load_dotenv()
@@ -17,6 +19,7 @@ load_dotenv()
 async def main():
     
     print("Multi-Agent System\n")    
+    encoder_warm_up = warm_up("all-MiniLM-L6-v2")
     key = os.getenv("groq")
     model_info = {
         "family": "oss",
@@ -39,7 +42,11 @@ async def main():
         vector_k=5,
         vector_threshold=0.3,
         db_path="nexus_ai/datastorage/agent_long_term.db",
-        vector_persist_path="nexus_ai/datastorage/agent_vectors.faiss"
+        vector_persist_path="nexus_ai/datastorage/agent_vectors.faiss",
+        vector_persist_mode="wal",
+        dedup_threshold=0.95,
+        write_behind=True,
+        embedding_executor=EmbeddingExecutor(max_workers=2)
     )
     
     planner = PlannerAgent(model_client)
@@ -71,6 +78,9 @@ async def main():
         "Plan a startup in AI for healthcare",
     ]
     
+    # The model loads while the agents are built; wait for it before the first memory query
+    await encoder_warm_up
+    
     for task in tasks:
         result = await orchestrator.execute(task, use_memory=True)
         
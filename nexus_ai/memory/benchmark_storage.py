@@ -0,0 +1,91 @@
+"""Recall and size of each vector storage option against exact float32 search.
+
+Run with: python -m nexus_ai.memory.benchmark_storage [--n 20000] [--index-type flat]
+
+Vectors are synthetic, clustered unit vectors shaped like all-MiniLM-L6-v2
+embeddings (384 dimensions), so the numbers do not depend on downloading the model.
+"""
+from typing import Tuple
+import argparse
+import os
+import tempfile
+import time
+import faiss
+import numpy as np
+from nexus_ai.memory.index_tiers import INDEX_TYPES, STORAGE_TYPES, build_index, configure_search
+
+
+def synthetic_embeddings(n: int, queries: int, dimension: int = 384, clusters: int = 200, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension)).astype("float32")
+    vectors = centers[rng.integers(clusters, size=n)] + 0.6 * rng.standard_normal((n, dimension)).astype("float32")
+    faiss.normalize_L2(vectors)
+    
+    query_vectors = vectors[rng.integers(n, size=queries)] + 0.3 * rng.standard_normal((queries, dimension)).astype("float32")
+    faiss.normalize_L2(query_vectors)
+    return vectors, query_vectors
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(row) & set(expected)) for row, expected in zip(found, truth))
+    return hits / truth.size
+
+
+def run(n: int, queries: int, k: int, index_type: str, rerank: int, pq_m: int) -> None:
+    vectors, query_vectors = synthetic_embeddings(n, queries)
+    _, truth = _exact_search(vectors, query_vectors, k)
+    
+    print(f"{n} vectors, {queries} queries, recall@{k}, index_type={index_type}, pq_m={pq_m}\n")
+    print(f"| storage | bytes/vector | compression | recall | recall with rerank x{rerank} | ms/query |")
+    print("|---|---|---|---|---|---|")
+    
+    baseline_size = None
+    for storage in STORAGE_TYPES:
+        index = build_index(index_type, vectors, pq_m=pq_m, storage=storage)
+        configure_search(index, nprobe=16, ef_search=64)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.faiss")
+            faiss.write_index(index, path)
+            size = os.path.getsize(path)
+        baseline_size = baseline_size or size
+        
+        start = time.perf_counter()
+        _, found = index.search(query_vectors, k)
+        elapsed = (time.perf_counter() - start) * 1000 / queries
+        
+        _, candidates = index.search(query_vectors, k * rerank)
+        reranked = _rerank(vectors, query_vectors, candidates, k)
+        
+        print(
+            f"| {storage} | {size / n:.0f} | {baseline_size / size:.1f}x | "
+            f"{recall_at_k(found, truth):.3f} | {recall_at_k(reranked, truth):.3f} | {elapsed:.3f} |"
+        )
+
+
+def _exact_search(vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    return index.search(query_vectors, k)
+
+
+def _rerank(vectors: np.ndarray, query_vectors: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+    # Same ordering as FAISSVectorMemory._rerank_exact, with the originals in RAM
+    found = candidates >= 0
+    exact = vectors[np.where(found, candidates, 0)]
+    distances = np.where(found, ((exact - query_vectors[:, None, :]) ** 2).sum(axis=2), np.inf)
+    order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat")
+    parser.add_argument("--rerank", type=int, default=4)
+    parser.add_argument("--pq-m", type=int, default=48)
+    args = parser.parse_args()
+    
+    run(args.n, args.queries, args.k, args.index_type, args.rerank, args.pq_m)
\ No newline at end of file
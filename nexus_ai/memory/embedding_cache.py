@@ -0,0 +1,143 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import sqlite3
+import numpy as np
+
+class EmbeddingCache:
+    """Embeddings keyed by model name and content hash, with an LRU tier and an optional SQLite tier"""
+    
+    def __init__(self, max_entries: int = 10000, disk_path: Optional[str] = None):
+        self._max_entries = max_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        
+        if disk_path:
+            self._conn = sqlite3.connect(disk_path)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL
+                )
+            """)
+            self._conn.commit()
+    
+    @staticmethod
+    def key(model_name: str, text: str) -> str:
+        return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+    
+    def encode(self, encoder: Any, model_name: str, texts: List[str]) -> np.ndarray:
+        keys, found, missing = self.lookup(model_name, texts)
+        
+        if missing:
+            embeddings = encoder.encode(list(missing.values()), convert_to_numpy=True)
+            found.update(self.store(list(missing.keys()), embeddings))
+        
+        return self.assemble(keys, found)
+    
+    def lookup(self, model_name: str, texts: List[str]) -> Tuple[List[str], Dict[str, np.ndarray], Dict[str, str]]:
+        """Split texts into cached vectors and the unique texts that still need encoding"""
+        keys = [self.key(model_name, text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        
+        for key in keys:
+            if key in found:
+                continue
+            vector = self._get_memory(key)
+            if vector is not None:
+                self.hits += 1
+                found[key] = vector
+        
+        if self._conn is not None:
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            for key, vector in self._get_disk(missing).items():
+                self.disk_hits += 1
+                found[key] = vector
+                self._put_memory(key, vector)
+        
+        missing_texts: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing_texts:
+                missing_texts[key] = text
+        self.misses += len(missing_texts)
+        
+        return keys, found, missing_texts
+    
+    def store(self, keys: List[str], embeddings: np.ndarray) -> Dict[str, np.ndarray]:
+        new_entries = dict(zip(keys, np.asarray(embeddings, dtype="float32")))
+        for key, vector in new_entries.items():
+            self._put_memory(key, vector)
+        self._put_disk(new_entries)
+        return new_entries
+    
+    @staticmethod
+    def assemble(keys: List[str], found: Dict[str, np.ndarray]) -> np.ndarray:
+        return np.stack([found[key] for key in keys]).astype("float32", copy=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+        }
+    
+    def clear(self) -> None:
+        self._memory.clear()
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+    
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def _get_memory(self, key: str) -> Optional[np.ndarray]:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+        return vector
+    
+    def _put_memory(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+    
+    def _get_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        if self._conn is None or not keys:
+            return {}
+        
+        results = {}
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                chunk
+            ).fetchall()
+            for key, blob in rows:
+                results[key] = np.frombuffer(blob, dtype="float32").copy()
+        return results
+    
+    def _put_disk(self, entries: Dict[str, np.ndarray]) -> None:
+        if self._conn is None or not entries:
+            return
+        
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)",
+            [(key, vector.shape[0], vector.tobytes()) for key, vector in entries.items()]
+        )
+        self._conn.commit()
+    
+    def __len__(self) -> int:
+        return len(self._memory)
\ No newline at end of file
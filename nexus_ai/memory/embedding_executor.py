@@ -0,0 +1,72 @@
+from typing import Any, Callable, Dict, List, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
+import numpy as np
+
+class EmbeddingExecutor:
+    """Runs encoder and index calls on a bounded thread pool, coalescing concurrent encodes into one batch"""
+    
+    def __init__(
+        self,
+        max_workers: int = 2,
+        batch_window: float = 0.005,
+        max_batch_size: int = 64
+    ):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embedding")
+        self._batch_window = batch_window
+        self._max_batch_size = max_batch_size
+        self._pending: Dict[int, Tuple[Any, List[Tuple[List[str], asyncio.Future]]]] = {}
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def encode(self, encoder: Any, texts: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = id(encoder)
+        
+        _, batch = self._pending.setdefault(key, (encoder, []))
+        batch.append((texts, future))
+        
+        if sum(len(item[0]) for item in batch) >= self._max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self._batch_window, self._flush, key)
+        
+        return await future
+    
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, partial(fn, *args))
+    
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+    
+    def _flush(self, key: int) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            encoder, batch = pending
+            task = asyncio.ensure_future(self._encode_batch(encoder, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _encode_batch(self, encoder: Any, batch: List[Tuple[List[str], asyncio.Future]]) -> None:
+        texts = [text for item_texts, _ in batch for text in item_texts]
+        
+        try:
+            embeddings = await self.run(partial(encoder.encode, convert_to_numpy=True), texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        offset = 0
+        for item_texts, future in batch:
+            if not future.done():
+                future.set_result(embeddings[offset:offset + len(item_texts)])
+            offset += len(item_texts)
\ No newline at end of file
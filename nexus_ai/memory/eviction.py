@@ -0,0 +1,27 @@
+from typing import Callable, Dict
+import numpy as np
+
+# A policy gets the records of the live rows and how many must go, and returns
+# positions into that array, most evictable first.
+EvictionPolicy = Callable[[np.ndarray, int], np.ndarray]
+
+
+def evict_oldest(records: np.ndarray, count: int) -> np.ndarray:
+    return np.argsort(records["timestamp"], kind="stable")[:count]
+
+
+def evict_lowest_importance(records: np.ndarray, count: int) -> np.ndarray:
+    return np.lexsort((records["timestamp"], records["importance"]))[:count]
+
+
+def evict_least_recently_retrieved(records: np.ndarray, count: int) -> np.ndarray:
+    # Rows never retrieved count as last used when they were written
+    last_used = np.maximum(records["last_access"], records["timestamp"])
+    return np.argsort(last_used, kind="stable")[:count]
+
+
+EVICTION_POLICIES: Dict[str, EvictionPolicy] = {
+    "oldest": evict_oldest,
+    "importance": evict_lowest_importance,
+    "lru": evict_least_recently_retrieved
+}
\ No newline at end of file
@@ -0,0 +1,138 @@
+from typing import List, Optional, Tuple
+import os
+import struct
+import numpy as np
+
+_MAGIC = b"NXVEC"
+_HEADER = struct.Struct("<5sI")
+
+
+class ExactVectors:
+    """Full-precision copies of indexed vectors, one per row, used to re-rank
+    candidates found in a compressed index. Persisted copies stay on disk and
+    are only paged in for the rows being re-ranked."""
+    
+    def __init__(self, path: Optional[str] = None, read_only: bool = False):
+        self._path = path
+        self._read_only = read_only
+        self._dimension = 0
+        self._count = 0
+        
+        if path is None:
+            self._vectors = np.zeros((0, 0), dtype="float32")
+            return
+        
+        self._open()
+    
+    def append(self, vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+        if not len(vectors):
+            return
+        
+        if not self._dimension:
+            self._dimension = vectors.shape[1]
+            if self._path is None:
+                self._vectors = np.zeros((16, self._dimension), dtype="float32")
+            else:
+                self._file.seek(0)
+                self._file.write(_HEADER.pack(_MAGIC, self._dimension))
+        
+        if self._path is None:
+            needed = self._count + len(vectors)
+            if needed > len(self._vectors):
+                grown = np.zeros((max(needed, 2 * len(self._vectors)), self._dimension), dtype="float32")
+                grown[:self._count] = self._vectors[:self._count]
+                self._vectors = grown
+            self._vectors[self._count:needed] = vectors
+        else:
+            self._file.seek(_HEADER.size + self._count * self._row_size)
+            self._file.write(vectors.tobytes())
+            self._file.flush()
+            self._mapped = None
+        
+        self._count += len(vectors)
+    
+    def get(self, rows: np.ndarray) -> np.ndarray:
+        if self._path is None:
+            return self._vectors[rows]
+        
+        if self._mapped is None:
+            self._mapped = np.memmap(
+                self._path,
+                dtype="float32",
+                mode="r",
+                offset=_HEADER.size,
+                shape=(self._count, self._dimension)
+            )
+        return np.asarray(self._mapped[rows])
+    
+    def compact(self, rows: np.ndarray, tmp_suffix: str = ".tmp") -> List[Tuple[str, str]]:
+        """Keep only `rows`; when persisted, returns (temp, final) paths for the caller to rename into place"""
+        kept = self.get(rows) if self._count else np.zeros((0, self._dimension), dtype="float32")
+        
+        if self._path is None:
+            self._vectors = kept.copy()
+            self._count = len(kept)
+            return []
+        
+        tmp_path = f"{self._path}{tmp_suffix}"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self._dimension))
+            f.write(kept.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        return [(tmp_path, self._path)]
+    
+    def truncate(self, count: int) -> None:
+        if count >= self._count:
+            return
+        
+        if self._path is not None:
+            self._mapped = None
+            if not self._read_only:
+                self._file.truncate(_HEADER.size + count * self._row_size)
+        self._count = count
+    
+    def reopen(self) -> None:
+        if self._path is not None:
+            self.close()
+            self._open()
+    
+    def flush(self) -> None:
+        if self._path is not None and not self._read_only:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+    
+    def clear(self) -> None:
+        self.truncate(0)
+    
+    def close(self) -> None:
+        if self._path is None:
+            return
+        
+        self.flush()
+        self._mapped = None
+        if self._file is not None:
+            self._file.close()
+    
+    @property
+    def _row_size(self) -> int:
+        return self._dimension * 4
+    
+    def _open(self) -> None:
+        self._mapped: Optional[np.memmap] = None
+        if self._read_only and not os.path.exists(self._path):
+            self._file = None
+            self._dimension = self._count = 0
+            return
+        if not os.path.exists(self._path):
+            with open(self._path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, 0))
+        
+        self._file = open(self._path, "rb" if self._read_only else "r+b")
+        _, self._dimension = _HEADER.unpack(self._file.read(_HEADER.size))
+        size = os.path.getsize(self._path) - _HEADER.size
+        self._count = size // self._row_size if self._dimension else 0
+    
+    def __len__(self) -> int:
+        return self._count
\ No newline at end of file
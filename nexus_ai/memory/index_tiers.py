@@ -0,0 +1,183 @@
+from typing import Optional, Tuple
+import math
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+STORAGE_TYPES = ("float32", "float16", "sq8", "pq")
+
+_SCALAR_QUANTIZERS = {
+    "float16": faiss.ScalarQuantizer.QT_fp16,
+    "sq8": faiss.ScalarQuantizer.QT_8bit
+}
+
+# FAISS warns below ~39 training points per centroid
+_MIN_POINTS_PER_CENTROID = 39
+_MIN_PQ_BITS = 4
+
+
+def index_type_of(index: faiss.Index) -> str:
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf_flat"
+    return "flat"
+
+
+def storage_of(index: faiss.Index) -> str:
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        index = faiss.downcast_index(index.storage)
+    if isinstance(index, (faiss.IndexPQ, faiss.IndexIVFPQ)):
+        return "pq"
+    if isinstance(index, (faiss.IndexScalarQuantizer, faiss.IndexIVFScalarQuantizer)):
+        return "float16" if index.sq.qtype == faiss.ScalarQuantizer.QT_fp16 else "sq8"
+    return "float32"
+
+
+def min_training_rows(index_type: str, storage: str) -> int:
+    """Fewest rows build_index can train on without FAISS warning about too few points"""
+    if index_type == "ivf_pq" or storage == "pq":
+        return _MIN_POINTS_PER_CENTROID * 2 ** _MIN_PQ_BITS
+    if index_type == "ivf_flat":
+        return _MIN_POINTS_PER_CENTROID
+    return 0
+
+
+def build_index(
+    index_type: str,
+    vectors: np.ndarray,
+    nlist: Optional[int] = None,
+    pq_m: int = 48,
+    hnsw_m: int = 32,
+    storage: str = "float32"
+) -> faiss.Index:
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index_type: {index_type}")
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f"Unknown storage: {storage}")
+    
+    n, dimension = vectors.shape
+    nbits = max(_MIN_PQ_BITS, min(8, int(math.log2(max(n, 1) / _MIN_POINTS_PER_CENTROID))))
+    
+    if index_type == "flat" and storage == "pq":
+        # IndexPQ rejects ID selectors; a single inverted list scans every code the same way
+        index_type, nlist = "ivf_pq", 1
+    
+    if index_type == "flat":
+        if storage == "float32":
+            index = faiss.IndexFlatL2(dimension)
+        else:
+            index = faiss.IndexScalarQuantizer(dimension, _SCALAR_QUANTIZERS[storage], faiss.METRIC_L2)
+    elif index_type == "hnsw":
+        if storage == "float32":
+            index = faiss.IndexHNSWFlat(dimension, hnsw_m)
+        elif storage == "pq":
+            index = faiss.IndexHNSWPQ(dimension, pq_m, hnsw_m, nbits)
+        else:
+            index = faiss.IndexHNSWSQ(dimension, _SCALAR_QUANTIZERS[storage], hnsw_m)
+    else:
+        if nlist is None:
+            nlist = int(4 * math.sqrt(n))
+        nlist = max(1, min(nlist, n // _MIN_POINTS_PER_CENTROID))
+        
+        quantizer = faiss.IndexFlatL2(dimension)
+        if index_type == "ivf_pq" or storage == "pq":
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, nbits)
+        elif storage == "float32":
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist)
+        else:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dimension, nlist, _SCALAR_QUANTIZERS[storage])
+        index.train(vectors)
+        # Keep rows reconstructible so the index can be rebuilt or trimmed later
+        index.make_direct_map()
+    
+    if not index.is_trained:
+        index.train(vectors)
+    if n:
+        index.add(vectors)
+    return index
+
+
+def configure_search(
+    index: faiss.Index,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None
+) -> None:
+    index_type = index_type_of(index)
+    if index_type in ("ivf_flat", "ivf_pq") and nprobe is not None:
+        faiss.extract_index_ivf(index).nprobe = nprobe
+    elif index_type == "hnsw" and ef_search is not None:
+        faiss.downcast_index(index).hnsw.efSearch = ef_search
+
+
+def truncate_index(index: faiss.Index, n: int) -> None:
+    rebuild_index(index, all_vectors(index)[:n])
+
+
+def rebuild_index(index: faiss.Index, vectors: np.ndarray) -> None:
+    # reset() keeps trained IVF centroids, and HNSW graphs cannot drop rows in place
+    index.reset()
+    if len(vectors):
+        index.add(vectors)
+
+
+def search_index(
+    index: faiss.Index,
+    embeddings: np.ndarray,
+    k: int,
+    allowed: Optional[np.ndarray] = None,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Search, skipping rows whose entry in the boolean `allowed` mask is False"""
+    if allowed is None:
+        return index.search(embeddings, k)
+    
+    bits = np.packbits(allowed, bitorder="little")
+    selector = faiss.IDSelectorBitmap(len(allowed), faiss.swig_ptr(bits))
+    
+    index_type = index_type_of(index)
+    if index_type in ("ivf_flat", "ivf_pq"):
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=nprobe or faiss.extract_index_ivf(index).nprobe)
+    elif index_type == "hnsw":
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=ef_search or faiss.downcast_index(index).hnsw.efSearch)
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    
+    # `bits` must stay alive until the search returns; the selector only borrows it
+    distances, indices = index.search(embeddings, k, params=params)
+    del bits
+    return distances, indices
+
+
+def all_vectors(index: faiss.Index) -> np.ndarray:
+    if index.ntotal == 0:
+        return np.zeros((0, index.d), dtype="float32")
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def read_index_mmap(path: str) -> faiss.Index:
+    """Open a persisted index with its vectors or inverted lists mapped from disk instead of copied"""
+    # MMAP_IFC maps flat/HNSW codes zero-copy; older builds only map IVF lists
+    return faiss.read_index(path, getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP))
+
+
+def merge_search(
+    base_result: Tuple[np.ndarray, np.ndarray],
+    delta_result: Tuple[np.ndarray, np.ndarray],
+    delta_offset: int,
+    k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    base_distances, base_indices = base_result
+    delta_distances, delta_indices = delta_result
+    delta_indices = np.where(delta_indices >= 0, delta_indices + delta_offset, -1)
+    
+    distances = np.concatenate([base_distances, delta_distances], axis=1)
+    indices = np.concatenate([base_indices, delta_indices], axis=1)
+    # Padding rows (-1) sort last because FAISS gives them the largest distance
+    order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(distances, order, axis=1), np.take_along_axis(indices, order, axis=1)
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""Export a long-term memory database to JSONL, or import one into it.
+
+Run with: python -m nexus_ai.memory.long_term_dump export|import <db_path> <jsonl_path>
+
+Rows are streamed in chunks, so memory use stays flat however large the database is.
+"""
+import argparse
+import asyncio
+from nexus_ai.memory.long_term_memory import LongTermMemory
+
+
+async def run(command: str, db_path: str, jsonl_path: str) -> None:
+    memory = LongTermMemory(db_path=db_path)
+    try:
+        if command == "export":
+            count = await memory.export_jsonl(jsonl_path)
+            print(f"Exported {count} memories to {jsonl_path}")
+        else:
+            count = await memory.import_jsonl(jsonl_path)
+            print(f"Imported {count} memories into {db_path}")
+    finally:
+        await memory.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("db_path")
+    parser.add_argument("jsonl_path")
+    args = parser.parse_args()
+    
+    asyncio.run(run(args.command, args.db_path, args.jsonl_path))
\ No newline at end of file
@@ -1,15 +1,85 @@
 import sqlite3
 import json
-from typing import List, Optional, Dict, Any
+import re
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, AsyncIterator, Sequence, Tuple
 from autogen_core.memory import Memory, MemoryContent, MemoryMimeType
+from nexus_ai.memory.long_term_records import LongTermFilter, LongTermRecord, select_columns, split_metadata
+from nexus_ai.memory.namespaces import namespaced_path
+from nexus_ai.memory.sqlite_executor import SQLiteExecutor
+
+_MAX_QUERY_TERMS = 32
+
+# Too frequent to tell memories apart; dropped from FTS queries unless nothing else is left
+_STOPWORDS = frozenset("""
+    a about after all also am an and any are as at be been before but by can could did do does
+    for from had has have he her him his how i if in into is it its me my no not of on or our
+    she so than that the their them then there these they this to was we were what when where
+    which who why will with would you your
+""".split())
+
+# Terms matching more than this share of rows add little to bm25 but cost a full doclist scan
+_COMMON_TERM_SHARE = 0.2
+_MIN_COMMON_TERM_ROWS = 1000
+_COMMON_TERM_CACHE_SIZE = 4096
+
+# FTS5 picks this many candidates per result by bm25 alone; only those get importance and recency weighting
+_FTS_CANDIDATES_PER_RESULT = 20
+
+_IMPORTANT_CACHE_SIZE = 32
+
+_INSERT_SQL = """
+    INSERT INTO memories (content, memory_type, mime_type, category, role, turn, timestamp, metadata, importance)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_IMPORT_SQL = """
+    INSERT INTO memories (content, memory_type, mime_type, category, role, turn, timestamp, metadata, importance, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+"""
+
+# Sort key of iterate(); NULL importance or created_at would fail every keyset
+# comparison and silently drop the row, so both sort last through COALESCE
+_KEYSET = ("COALESCE(m.importance, -1)", "COALESCE(m.created_at, '')", "m.id")
+
+# BM25 from FTS5 is negative, better matches more so; importance scales it up and age
+# decays it, so ORDER BY ascending puts the best candidates first. NULL importance or
+# dates would make the whole key NULL, which sorts ahead of every real match
+_FTS_RANK = """
+    f.rank
+    * (1 + MAX(COALESCE(m.importance, 0), 0) / 10.0)
+    / (1 + (julianday('now') - julianday(COALESCE(m.last_seen_at, m.created_at, 'now'))) / 30.0)
+"""
+
 
 class LongTermMemory(Memory):
-    def __init__(self, db_path: str = "long_term.db"):
-        self.db_path = db_path
-        self._init_db()
+    def __init__(self, db_path: str = "long_term.db", namespace: Optional[str] = None, readers: int = 4):
+        # Each namespace gets its own database file
+        self.namespace = namespace
+        self.db_path = namespaced_path(db_path, namespace)
+        # SQLite runs on its own threads so commits never stall the event loop
+        self._db = SQLiteExecutor(self._connect, readers=0 if self.db_path == ":memory:" else readers)
+        self._db.submit_write(self._init_db).result()
+        
+        # get_important_memories results by (min_importance, limit); the generation
+        # lets a read that raced a write skip caching its now-stale result
+        self._important: "OrderedDict[Tuple[int, int], List[MemoryContent]]" = OrderedDict()
+        self._important_generation = 0
+        
+        # Whether each query term is common, valid while the row count stays near _common_rows
+        self._common_terms: Dict[str, bool] = {}
+        self._common_rows = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Connections live as long as the store. In WAL mode readers are not
+        # blocked by the writer, and synchronous=NORMAL only fsyncs at checkpoints:
+        # a power loss may drop the last commits but never corrupts the database
+        conn = sqlite3.connect(self.db_path, cached_statements=256, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
     
-    def _init_db(self) -> None:
-        conn = sqlite3.connect(self.db_path)
+    def _init_db(self, conn: sqlite3.Connection) -> None:
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -18,12 +88,40 @@ class LongTermMemory(Memory):
                 content TEXT NOT NULL,
                 memory_type TEXT NOT NULL,
                 mime_type TEXT,
+                category TEXT,
+                role TEXT,
+                turn INTEGER,
+                timestamp TEXT,
                 metadata TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                importance INTEGER DEFAULT 0
+                importance INTEGER DEFAULT 0,
+                occurrences INTEGER DEFAULT 1,
+                last_seen_at TIMESTAMP
             )
         """)
         
+        # Databases created before duplicate folding lack its columns
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(memories)")}
+        if "occurrences" not in columns:
+            cursor.execute("ALTER TABLE memories ADD COLUMN occurrences INTEGER DEFAULT 1")
+        if "last_seen_at" not in columns:
+            cursor.execute("ALTER TABLE memories ADD COLUMN last_seen_at TIMESTAMP")
+        
+        # Older databases keep every metadata key in the JSON blob; move the typed ones out
+        if "category" not in columns:
+            for column, kind in (("category", "TEXT"), ("role", "TEXT"), ("turn", "INTEGER"), ("timestamp", "TEXT")):
+                cursor.execute(f"ALTER TABLE memories ADD COLUMN {column} {kind}")
+            rows = cursor.execute("SELECT id, metadata FROM memories WHERE metadata IS NOT NULL").fetchall()
+            cursor.executemany(
+                "UPDATE memories SET category = ?, role = ?, turn = ?, timestamp = ?, metadata = ? WHERE id = ?",
+                [(*split_metadata(json.loads(metadata)), row_id) for row_id, metadata in rows]
+            )
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_content
+            ON memories(content)
+        """)
+        
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_memory_type 
             ON memories(memory_type)
@@ -34,137 +132,393 @@ class LongTermMemory(Memory):
             ON memories(importance DESC)
         """)
         
-        conn.commit()
-        conn.close()
+        # Lets iterate() seek straight to each page instead of skipping OFFSET rows;
+        # the expressions must match _KEYSET for the planner to use it
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_keyset_coalesced
+            ON memories(COALESCE(importance, -1), COALESCE(created_at, ''), id)
+        """)
+        
+        for column in ("category", "role", "turn", "timestamp"):
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{column} ON memories({column})")
+        
+        self._fts = self._init_fts(cursor)
+        self._init_stats(cursor)
+    
+    def _init_stats(self, cursor: sqlite3.Cursor) -> None:
+        """Row counts per (memory_type, importance), kept current by triggers so stats never scan memories"""
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_stats'"
+        ).fetchone() is not None
+        
+        cursor.executescript("""
+            CREATE TABLE IF NOT EXISTS memory_stats (
+                memory_type TEXT NOT NULL,
+                importance INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (memory_type, importance)
+            ) WITHOUT ROWID;
+            CREATE TRIGGER IF NOT EXISTS memory_stats_insert AFTER INSERT ON memories BEGIN
+                INSERT INTO memory_stats (memory_type, importance, count) VALUES (new.memory_type, COALESCE(new.importance, 0), 1)
+                ON CONFLICT (memory_type, importance) DO UPDATE SET count = count + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS memory_stats_delete AFTER DELETE ON memories BEGIN
+                UPDATE memory_stats SET count = count - 1
+                WHERE memory_type = old.memory_type AND importance = COALESCE(old.importance, 0);
+            END;
+            CREATE TRIGGER IF NOT EXISTS memory_stats_update AFTER UPDATE OF memory_type, importance ON memories BEGIN
+                UPDATE memory_stats SET count = count - 1
+                WHERE memory_type = old.memory_type AND importance = COALESCE(old.importance, 0);
+                INSERT INTO memory_stats (memory_type, importance, count) VALUES (new.memory_type, COALESCE(new.importance, 0), 1)
+                ON CONFLICT (memory_type, importance) DO UPDATE SET count = count + 1;
+            END;
+        """)
+        
+        if not exists:
+            # Count rows written before the stats table existed
+            cursor.execute("""
+                INSERT INTO memory_stats (memory_type, importance, count)
+                SELECT memory_type, COALESCE(importance, 0), COUNT(*) FROM memories
+                GROUP BY memory_type, COALESCE(importance, 0)
+            """)
+    
+    def _init_fts(self, cursor: sqlite3.Cursor) -> bool:
+        """Keep an FTS5 index over memories.content; False when SQLite was built without FTS5"""
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memories_fts'"
+        ).fetchone() is not None
+        
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+                    content,
+                    content='memories',
+                    content_rowid='id',
+                    tokenize='porter unicode61'
+                )
+            """)
+        except sqlite3.OperationalError:
+            return False
+        
+        cursor.executescript("""
+            CREATE TRIGGER IF NOT EXISTS memories_fts_insert AFTER INSERT ON memories BEGIN
+                INSERT INTO memories_fts(rowid, content) VALUES (new.id, new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories BEGIN
+                INSERT INTO memories_fts(memories_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS memories_fts_update AFTER UPDATE OF content ON memories BEGIN
+                INSERT INTO memories_fts(memories_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                INSERT INTO memories_fts(rowid, content) VALUES (new.id, new.content);
+            END;
+        """)
+        
+        if not exists:
+            # Index rows written before the full-text table existed
+            cursor.execute("INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')")
+        return True
     
     async def add(
         self,
         content: MemoryContent,
         memory_type: str = "episodic",
-        importance: int = 0
+        importance: int = 0,
+        dedup: bool = False
     ) -> None:
-        conn = sqlite3.connect(self.db_path)
+        await self.add_many([(content, memory_type, importance)], dedup=dedup)
+    
+    async def add_many(
+        self,
+        items: Sequence[Tuple[MemoryContent, str, int]],
+        dedup: bool = False
+    ) -> None:
+        """Add (content, memory_type, importance) items in one transaction"""
+        if not items:
+            return
+        
+        rows = [
+            (
+                content.content,
+                memory_type,
+                content.mime_type.value if isinstance(content.mime_type, MemoryMimeType) else content.mime_type,
+                *split_metadata(content.metadata),
+                importance
+            )
+            for content, memory_type, importance in items
+        ]
+        await self._db.write(lambda conn: self._insert_rows(conn, rows, dedup))
+        
+        # A dedup hit refreshes last_seen_at, reordering rows of any importance
+        self._invalidate_important(None if dedup else max(row[-1] or 0 for row in rows))
+    
+    @staticmethod
+    def _insert_rows(conn: sqlite3.Connection, rows: List[Tuple[Any, ...]], dedup: bool) -> None:
         cursor = conn.cursor()
         
-        metadata_json = json.dumps(content.metadata) if content.metadata else None
+        if not dedup:
+            cursor.executemany(_INSERT_SQL, rows)
+            return
         
-        cursor.execute("""
-            INSERT INTO memories (content, memory_type, mime_type, metadata, importance)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            content.content,
-            memory_type,
-            content.mime_type.value if isinstance(content.mime_type, MemoryMimeType) else content.mime_type,
-            metadata_json,
-            importance
-        ))
-        
-        conn.commit()
-        conn.close()
+        for row in rows:
+            content, memory_type, importance = row[0], row[1], row[-1]
+            # Fold a repeat of an existing memory, or of one earlier in the batch, into it
+            cursor.execute("""
+                UPDATE memories
+                SET occurrences = occurrences + 1,
+                    last_seen_at = CURRENT_TIMESTAMP,
+                    importance = MAX(importance, ?)
+                WHERE content = ? AND memory_type = ?
+            """, (importance, content, memory_type))
+            if not cursor.rowcount:
+                cursor.execute(_INSERT_SQL, row)
     
     async def query(
         self,
         query: str,
         memory_type: Optional[str] = None,
-        limit: int = 10
+        limit: int = 10,
+        where: Optional[LongTermFilter] = None
     ) -> List[MemoryContent]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        records = await self._search(query, memory_type, limit, where)
+        return [record.to_memory_content() for record in records]
+    
+    async def find(self, where: Optional[LongTermFilter] = None, limit: int = 50) -> List[LongTermRecord]:
+        """Most important, most recent rows matching `where`; metadata is decoded on access"""
+        return await self._search("", None, limit, where)
+    
+    async def _search(
+        self,
+        query: str,
+        memory_type: Optional[str],
+        limit: int,
+        where: Optional[LongTermFilter]
+    ) -> List[LongTermRecord]:
+        match = await self._match_expression(query) if self._fts else ""
         
-        sql = """
-            SELECT content, mime_type, metadata
-            FROM memories
-            WHERE content LIKE ?
-        """
-        params = [f"%{query}%"]
+        if match:
+            candidates = ""
+            params: List[Any] = [match]
+            if memory_type is None and where is None:
+                # Filters apply after the candidate cut, so filtered queries rank every match
+                candidates = " ORDER BY rank LIMIT ?"
+                params.append(limit * _FTS_CANDIDATES_PER_RESULT)
+            sql = f"""
+                SELECT {select_columns()}
+                FROM (
+                    SELECT rowid, rank FROM memories_fts WHERE memories_fts MATCH ?{candidates}
+                ) f
+                JOIN memories m ON m.id = f.rowid
+                WHERE 1
+            """
+        else:
+            sql = f"""
+                SELECT {select_columns()}
+                FROM memories m
+                WHERE 1
+            """
+            params = []
+            if query:
+                sql += " AND m.content LIKE ?"
+                params.append(f"%{query}%")
         
         if memory_type:
-            sql += " AND memory_type = ?"
+            sql += " AND m.memory_type = ?"
             params.append(memory_type)
         
-        sql += " ORDER BY importance DESC, created_at DESC LIMIT ?"
+        if where is not None:
+            conditions, where_params = where.where()
+            if conditions:
+                sql += f" AND {conditions}"
+                params.extend(where_params)
+        
+        if match:
+            sql += f" ORDER BY {_FTS_RANK} LIMIT ?"
+        else:
+            sql += " ORDER BY m.importance DESC, COALESCE(m.last_seen_at, m.created_at) DESC LIMIT ?"
         params.append(limit)
         
+        return await self._db.read(lambda conn: self._fetch_records(conn, sql, params))
+    
+    @staticmethod
+    def _fetch_records(conn: sqlite3.Connection, sql: str, params: Sequence[Any]) -> List[LongTermRecord]:
+        cursor = conn.cursor()
         cursor.execute(sql, params)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        results = []
-        for content, mime_type, metadata_json in rows:
-            metadata = json.loads(metadata_json) if metadata_json else None
-            results.append(MemoryContent(
-                content=content,
-                mime_type=mime_type,
-                metadata=metadata
-            ))
+        return [LongTermRecord(*row) for row in cursor.fetchall()]
+    
+    async def _match_expression(self, query: str) -> str:
+        """Any-word FTS5 query over the query's distinctive terms; each is quoted so FTS syntax in user text is matched literally"""
+        terms = list(dict.fromkeys(term.lower() for term in re.findall(r"\w+", query)))
+        terms = [term for term in terms if term not in _STOPWORDS] or terms
+        terms = terms[:_MAX_QUERY_TERMS]
+        if len(terms) > 1:
+            common = await self._db.read(lambda conn: self._find_common_terms(conn, terms))
+            rare = [term for term in terms if term not in common]
+            if not rare:
+                # Every term is common: rows mentioning all of them are few and cheap to rank
+                return " AND ".join(f'"{term}"' for term in terms)
+            terms = rare
+        return " OR ".join(f'"{term}"' for term in terms)
+    
+    def _find_common_terms(self, conn: sqlite3.Connection, terms: List[str]) -> List[str]:
+        rows = conn.execute("SELECT COALESCE(SUM(count), 0) FROM memory_stats").fetchone()[0]
+        stale = not self._common_rows / 2 <= rows <= self._common_rows * 2
+        if stale or len(self._common_terms) > _COMMON_TERM_CACHE_SIZE:
+            self._common_terms = {}
+            self._common_rows = rows
+        known = self._common_terms
         
-        return results
+        # Counting stops at the cutoff, so a common term costs a bounded doclist walk
+        cutoff = max(int(rows * _COMMON_TERM_SHARE), _MIN_COMMON_TERM_ROWS)
+        for term in terms:
+            if term not in known:
+                matches = conn.execute(
+                    "SELECT COUNT(*) FROM (SELECT 1 FROM memories_fts WHERE memories_fts MATCH ? LIMIT ?)",
+                    (f'"{term}"', cutoff + 1)
+                ).fetchone()[0]
+                known[term] = matches > cutoff
+        return [term for term in terms if known[term]]
     
     async def get_important_memories(
         self,
         min_importance: int = 5,
         limit: int = 20
     ) -> List[MemoryContent]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        key = (min_importance, limit)
+        cached = self._important.get(key)
+        if cached is not None:
+            self._important.move_to_end(key)
+            # Callers may edit what they get back, e.g. metadata; the cached copies must stay clean
+            return [content.model_copy(deep=True) for content in cached]
         
-        cursor.execute("""
-            SELECT content, mime_type, metadata
-            FROM memories
-            WHERE importance >= ?
-            ORDER BY importance DESC, created_at DESC
-            LIMIT ?
-        """, (min_importance, limit))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        results = []
-        for content, mime_type, metadata_json in rows:
-            metadata = json.loads(metadata_json) if metadata_json else None
-            results.append(MemoryContent(
-                content=content,
-                mime_type=mime_type,
-                metadata=metadata
-            ))
-        
-        return results
+        generation = self._important_generation
+        records = await self._search("", None, limit, LongTermFilter(min_importance=min_importance))
+        results = [record.to_memory_content() for record in records]
+        
+        if generation == self._important_generation:
+            self._important[key] = results
+            if len(self._important) > _IMPORTANT_CACHE_SIZE:
+                self._important.popitem(last=False)
+        return [content.model_copy(deep=True) for content in results]
+    
+    def _invalidate_important(self, max_importance: Optional[int] = None) -> None:
+        """Drop cached results a write up to `max_importance` could change; None drops all"""
+        self._important_generation += 1
+        for key in list(self._important):
+            if max_importance is None or key[0] <= max_importance:
+                del self._important[key]
+    
+    async def iterate(
+        self,
+        where: Optional[LongTermFilter] = None,
+        chunk_size: int = 500
+    ) -> AsyncIterator[LongTermRecord]:
+        """Every row matching `where`, most important first, fetched `chunk_size` rows at a time"""
+        conditions, params = where.where() if where is not None else ("", [])
+        base = f"SELECT {select_columns()} FROM memories m WHERE {conditions or '1'}"
+        last: Optional[Tuple[Any, Any, int]] = None
+        
+        while True:
+            # Keyset pagination: resume after the last row seen, so each page costs the same
+            if last is None:
+                sql, page_params = base, list(params)
+            else:
+                # The leading single-column bound is implied by the tuple, but only it lets SQLite seek the expression index
+                sql = base + f" AND {_KEYSET[0]} <= ? AND ({', '.join(_KEYSET)}) < (?, ?, ?)"
+                page_params = [*params, last[0], *last]
+            sql += " ORDER BY " + ", ".join(f"{key} DESC" for key in _KEYSET) + " LIMIT ?"
+            page_params.append(chunk_size)
+            
+            records = await self._db.read(lambda conn: self._fetch_records(conn, sql, page_params))
+            for record in records:
+                yield record
+            
+            if len(records) < chunk_size:
+                return
+            tail = records[-1]
+            last = (-1 if tail.importance is None else tail.importance, tail.created_at or "", tail.id)
+    
+    async def export_jsonl(self, path: str, where: Optional[LongTermFilter] = None) -> int:
+        """Write matching rows to `path`, one JSON object per line; returns the row count"""
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            async for record in self.iterate(where):
+                f.write(json.dumps(record.to_dict()) + "\n")
+                count += 1
+        return count
+    
+    async def import_jsonl(self, path: str, chunk_size: int = 1000) -> int:
+        """Append rows from an export_jsonl file, one transaction per chunk; returns the row count"""
+        count = 0
+        rows: List[Tuple[Any, ...]] = []
+        
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                
+                item = json.loads(line)
+                rows.append((
+                    item["content"],
+                    item.get("memory_type", "episodic"),
+                    item.get("mime_type"),
+                    *split_metadata(item.get("metadata")),
+                    item.get("importance", 0),
+                    item.get("created_at")
+                ))
+                if len(rows) >= chunk_size:
+                    await self._import_rows(rows)
+                    count += len(rows)
+                    rows = []
+        
+        if rows:
+            await self._import_rows(rows)
+            count += len(rows)
+        return count
+    
+    async def _import_rows(self, rows: List[Tuple[Any, ...]]) -> None:
+        await self._db.write(lambda conn: conn.executemany(_IMPORT_SQL, rows))
+        self._invalidate_important()
     
     async def clear(self) -> None:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM memories")
-        conn.commit()
-        conn.close()
+        await self._db.write(lambda conn: conn.execute("DELETE FROM memories"))
+        self._invalidate_important()
     
     async def close(self) -> None:
-        pass
+        await self._db.close()
     
     async def update_context(self, model_context: Any) -> None:
         pass
     
-    def get_stats(self) -> Dict[str, Any]:
+    async def get_stats(self) -> Dict[str, Any]:
         """Get memory statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM memories")
-        total = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM memories WHERE memory_type = 'episodic'")
-        episodic = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM memories WHERE memory_type = 'semantic'")
-        semantic = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT AVG(importance) FROM memories")
-        avg_importance = cursor.fetchone()[0] or 0
+        return await self._db.read(self._read_stats)
+    
+    def _read_stats(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        # memory_stats holds one row per (type, importance) pair, however many memories there are
+        rows = conn.execute("SELECT memory_type, importance, count FROM memory_stats WHERE count > 0").fetchall()
         
-        conn.close()
+        by_type: Dict[str, int] = {}
+        histogram: Dict[int, int] = {}
+        importance_sum = 0
+        for memory_type, importance, count in rows:
+            by_type[memory_type] = by_type.get(memory_type, 0) + count
+            histogram[importance] = histogram.get(importance, 0) + count
+            importance_sum += importance * count
         
+        total = sum(by_type.values())
         return {
             "total_memories": total,
-            "episodic": episodic,
-            "semantic": semantic,
-            "avg_importance": round(avg_importance, 2)
-        }
\ No newline at end of file
+            "episodic": by_type.get("episodic", 0),
+            "semantic": by_type.get("semantic", 0),
+            "avg_importance": round(importance_sum / total, 2) if total else 0,
+            "by_type": by_type,
+            "importance_histogram": dict(sorted(histogram.items()))
+        }
+    
+    async def health(self) -> Dict[str, Any]:
+        """Status plus the counters from get_stats; cheap enough to poll"""
+        try:
+            stats = await self.get_stats()
+        except (sqlite3.Error, RuntimeError) as e:
+            return {"status": "error", "error": str(e)}
+        return {"status": "ok", **stats}
\ No newline at end of file
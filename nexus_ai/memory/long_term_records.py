@@ -0,0 +1,145 @@
+from typing import Any, Dict, List, Optional, Tuple
+import json
+from autogen_core.memory import MemoryContent
+
+# Metadata keys stored in their own indexed columns; anything else goes to the JSON overflow
+TYPED_METADATA = {
+    "category": str,
+    "role": str,
+    "turn": int,
+    "timestamp": str
+}
+
+RECORD_COLUMNS = (
+    "id", "content", "memory_type", "mime_type", "importance", "created_at",
+    "category", "role", "turn", "timestamp", "metadata"
+)
+
+_UNDECODED = object()
+
+
+def split_metadata(metadata: Optional[Dict[str, Any]]) -> Tuple[Any, ...]:
+    """(category, role, turn, timestamp, overflow_json) for a metadata dict"""
+    if not metadata:
+        return None, None, None, None, None
+    
+    overflow = dict(metadata)
+    typed = []
+    for key, kind in TYPED_METADATA.items():
+        value = overflow.get(key)
+        # bool is an int subclass but would not round-trip through an INTEGER column
+        if isinstance(value, kind) and not isinstance(value, bool):
+            typed.append(overflow.pop(key))
+        else:
+            typed.append(None)
+    return (*typed, json.dumps(overflow) if overflow else None)
+
+
+def select_columns(alias: str = "m") -> str:
+    return ", ".join(f"{alias}.{column}" for column in RECORD_COLUMNS)
+
+
+class LongTermRecord:
+    """One row of the memories table. Metadata is assembled from the typed
+    columns and the JSON overflow only when first read."""
+    
+    __slots__ = (
+        "id", "content", "memory_type", "mime_type", "importance", "created_at",
+        "category", "role", "turn", "timestamp", "_overflow", "_metadata"
+    )
+    
+    def __init__(
+        self,
+        id: int,
+        content: str,
+        memory_type: str,
+        mime_type: str,
+        importance: int,
+        created_at: str,
+        category: Optional[str],
+        role: Optional[str],
+        turn: Optional[int],
+        timestamp: Optional[str],
+        overflow: Optional[str]
+    ):
+        self.id = id
+        self.content = content
+        self.memory_type = memory_type
+        self.mime_type = mime_type
+        self.importance = importance
+        self.created_at = created_at
+        self.category = category
+        self.role = role
+        self.turn = turn
+        self.timestamp = timestamp
+        self._overflow = overflow
+        self._metadata: Any = _UNDECODED
+    
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        if self._metadata is _UNDECODED:
+            typed = (self.category, self.role, self.turn, self.timestamp)
+            metadata = {key: value for key, value in zip(TYPED_METADATA, typed) if value is not None}
+            if self._overflow:
+                metadata.update(json.loads(self._overflow))
+            self._metadata = metadata or None
+        return self._metadata
+    
+    def to_memory_content(self) -> MemoryContent:
+        return MemoryContent(content=self.content, mime_type=self.mime_type, metadata=self.metadata)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "content": self.content,
+            "memory_type": self.memory_type,
+            "mime_type": self.mime_type,
+            "importance": self.importance,
+            "created_at": self.created_at,
+            "metadata": self.metadata
+        }
+
+
+class LongTermFilter:
+    """Predicates on the typed columns, compiled into the WHERE clause of a long-term query"""
+    
+    def __init__(
+        self,
+        memory_type: Optional[str] = None,
+        category: Optional[str] = None,
+        role: Optional[str] = None,
+        min_turn: Optional[int] = None,
+        max_turn: Optional[int] = None,
+        min_importance: Optional[int] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ):
+        self.memory_type = memory_type
+        self.category = category
+        self.role = role
+        self.min_turn = min_turn
+        self.max_turn = max_turn
+        self.min_importance = min_importance
+        # ISO-8601 strings, compared against the metadata timestamp
+        self.since = since
+        self.until = until
+    
+    def where(self, alias: str = "m") -> Tuple[str, List[Any]]:
+        """SQL conditions joined with AND (empty when nothing is set) and their parameters"""
+        conditions = []
+        params: List[Any] = []
+        
+        for column, operator, value in (
+            ("memory_type", "=", self.memory_type),
+            ("category", "=", self.category),
+            ("role", "=", self.role),
+            ("turn", ">=", self.min_turn),
+            ("turn", "<=", self.max_turn),
+            ("importance", ">=", self.min_importance),
+            ("timestamp", ">=", self.since),
+            ("timestamp", "<", self.until)
+        ):
+            if value is not None:
+                conditions.append(f"{alias}.{column} {operator} ?")
+                params.append(value)
+        return " AND ".join(conditions), params
\ No newline at end of file
@@ -1,9 +1,15 @@
-from typing import List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+import asyncio
+import copy
 from autogen_core.memory import Memory, MemoryContent, MemoryMimeType
 from autogen_core.models import UserMessage
 from nexus_ai.memory.session_memory import SessionMemory
 from nexus_ai.memory.vector_memory import FAISSVectorMemory
+from nexus_ai.memory.embedding_cache import EmbeddingCache
+from nexus_ai.memory.embedding_executor import EmbeddingExecutor
 from nexus_ai.memory.long_term_memory import LongTermMemory
+from nexus_ai.memory.namespaces import NamespacePool
+from nexus_ai.memory.write_behind import WriteBehindQueue
 
 class AgentMemorySystem(Memory):
     def __init__(
@@ -12,25 +18,165 @@ class AgentMemorySystem(Memory):
         vector_k: int = 5,
         vector_threshold: float = 0.3,
         db_path: str = "nexus_ai/datastorage/long_term_memory.db",
-        vector_persist_path: Optional[str] = "nexus_ai/datastorage/vector_store.faiss"
+        vector_persist_path: Optional[str] = "nexus_ai/datastorage/vector_store.faiss",
+        vector_persist_mode: str = "snapshot",
+        vector_index_type: str = "flat",
+        vector_promote_at: int = 10000,
+        vector_nprobe: int = 8,
+        vector_ef_search: int = 64,
+        vector_mmap: bool = False,
+        vector_max_entries: Optional[int] = None,
+        vector_ttl: Optional[float] = None,
+        vector_eviction_policy: str = "oldest",
+        vector_storage: str = "float32",
+        vector_rerank: int = 0,
+        dedup_threshold: Optional[float] = None,
+        embedding_cache_size: int = 10000,
+        embedding_cache_path: Optional[str] = None,
+        embedding_executor: Optional[EmbeddingExecutor] = None,
+        namespace: Optional[str] = None,
+        namespace_idle_timeout: float = 600.0,
+        write_behind: bool = False,
+        write_queue_size: int = 1000,
+        write_batch_size: int = 64
     ):
-        self.session = SessionMemory(max_turns=session_max_turns)
-        self.vector = FAISSVectorMemory(
+        # Every namespace has its own session, vector shard and long-term database,
+        # created on first use; None is the unpartitioned store used before namespaces
+        self.namespace = namespace
+        self.namespace_idle_timeout = namespace_idle_timeout
+        self.embedding_cache = EmbeddingCache(max_entries=embedding_cache_size, disk_path=embedding_cache_path)
+        self._sessions = NamespacePool(
+            lambda ns: SessionMemory(max_turns=session_max_turns, namespace=ns),
+            evictable=False
+        )
+        self._vectors = NamespacePool(lambda ns: FAISSVectorMemory(
             k=vector_k,
             score_threshold=vector_threshold,
-            persist_path=vector_persist_path
+            persist_path=vector_persist_path,
+            persist_mode=vector_persist_mode,
+            index_type=vector_index_type,
+            promote_at=vector_promote_at,
+            nprobe=vector_nprobe,
+            ef_search=vector_ef_search,
+            mmap=vector_mmap,
+            max_entries=vector_max_entries,
+            default_ttl=vector_ttl,
+            eviction_policy=vector_eviction_policy,
+            storage=vector_storage,
+            rerank=vector_rerank,
+            embedding_cache=self.embedding_cache,
+            executor=embedding_executor,
+            namespace=ns
+        ), evictable=vector_persist_path is not None)
+        # An in-memory database cannot be reloaded, so closing it when idle would lose it
+        self._long_terms = NamespacePool(
+            lambda ns: LongTermMemory(db_path=db_path, namespace=ns),
+            evictable=db_path != ":memory:"
         )
-        self.long_term = LongTermMemory(db_path=db_path)
+        # Cosine similarity at which add() folds an item into an existing entry; None stores everything
+        self.dedup_threshold = dedup_threshold
+        # With write_behind, add() updates the session and returns; vector and long-term
+        # writes are applied in the background and are visible to queries after flush().
+        # Long-term rows queue separately, so flush_vectors() need not wait for SQLite commits
+        self._write_behind: Optional[WriteBehindQueue] = None
+        self._long_term_behind: Optional[WriteBehindQueue] = None
+        if write_behind:
+            self._write_behind = WriteBehindQueue(self._apply_writes, max_pending=write_queue_size, max_batch=write_batch_size)
+            self._long_term_behind = WriteBehindQueue(self._apply_long_term_writes, max_pending=write_queue_size, max_batch=write_batch_size)
+    
+    @property
+    def session(self) -> SessionMemory:
+        return self._sessions.get(self.namespace)
+    
+    @property
+    def vector(self) -> FAISSVectorMemory:
+        return self._vectors.get(self.namespace)
+    
+    @property
+    def long_term(self) -> LongTermMemory:
+        return self._long_terms.get(self.namespace)
+    
+    def for_namespace(self, namespace: Optional[str]) -> "AgentMemorySystem":
+        """View of this system scoped to one tenant; it shares the caches and loaded stores of the original"""
+        view = copy.copy(self)
+        view.namespace = namespace
+        return view
+    
+    async def evict_idle_namespaces(self, max_idle: Optional[float] = None) -> List[Optional[str]]:
+        """Close stores of namespaces idle for longer than `max_idle` seconds; they reload on next use"""
+        max_idle = self.namespace_idle_timeout if max_idle is None else max_idle
+        evicted = set()
+        for pool in (self._vectors, self._long_terms):
+            evicted.update(await pool.evict_idle(max_idle, keep=[self.namespace]))
+        return sorted(evicted, key=str)
     
     async def add(self, content: MemoryContent, store_long_term: bool = False) -> None:
-
         await self.session.add(content)
-        await self.vector.add(content)
-
-        if store_long_term:
+        
+        if self._write_behind is not None:
+            await self._write_behind.put((self.namespace, content, store_long_term))
+            return
+        await self._persist([content], [content] if store_long_term else [])
+    
+    async def add_many(self, contents: List[MemoryContent], store_long_term: bool = False) -> None:
+        if not contents:
+            return
+        
+        for content in contents:
+            await self.session.add(content)
+        
+        if self._write_behind is not None:
+            for content in contents:
+                await self._write_behind.put((self.namespace, content, store_long_term))
+            return
+        await self._persist(contents, contents if store_long_term else [])
+    
+    async def flush(self) -> None:
+        """Wait for background writes queued by add() to reach the stores"""
+        if self._write_behind is not None:
+            await self._write_behind.flush()
+            await self._long_term_behind.flush()
+    
+    async def flush_vectors(self) -> None:
+        """Wait only until queued writes are searchable in the vector store; long-term rows may still be pending"""
+        if self._write_behind is not None:
+            await self._write_behind.flush()
+    
+    async def _apply_writes(self, batch: List[Tuple[Optional[str], MemoryContent, bool]]) -> None:
+        by_namespace: Dict[Optional[str], List[MemoryContent]] = {}
+        for namespace, content, _ in batch:
+            by_namespace.setdefault(namespace, []).append(content)
+        
+        for namespace, contents in by_namespace.items():
+            view = self.for_namespace(namespace)
+            await view.vector.add_many(contents, dedup_threshold=self.dedup_threshold)
+        
+        for namespace, content, store_long_term in batch:
+            if store_long_term:
+                await self._long_term_behind.put((namespace, content))
+    
+    async def _apply_long_term_writes(self, batch: List[Tuple[Optional[str], MemoryContent]]) -> None:
+        by_namespace: Dict[Optional[str], List[MemoryContent]] = {}
+        for namespace, content in batch:
+            by_namespace.setdefault(namespace, []).append(content)
+        
+        for namespace, contents in by_namespace.items():
+            await self.for_namespace(namespace)._persist_long_term(contents)
+    
+    async def _persist(self, contents: List[MemoryContent], long_term_contents: List[MemoryContent]) -> None:
+        """Vector and long-term writes for contents already in the session, run concurrently"""
+        writes = [self.vector.add_many(contents, dedup_threshold=self.dedup_threshold)]
+        if long_term_contents:
+            writes.append(self._persist_long_term(long_term_contents))
+        await asyncio.gather(*writes)
+    
+    async def _persist_long_term(self, contents: List[MemoryContent]) -> None:
+        items = []
+        for content in contents:
             importance = content.metadata.get("importance", 0) if content.metadata else 0
             memory_type = content.metadata.get("type", "episodic") if content.metadata else "episodic"
-            await self.long_term.add(content, memory_type=memory_type, importance=importance)
+            items.append((content, memory_type, importance))
+        await self.long_term.add_many(items, dedup=self.dedup_threshold is not None)
     
     async def query(self, query: str) -> List[MemoryContent]:
         
@@ -49,6 +195,24 @@ class AgentMemorySystem(Memory):
         
         return unique_results
     
+    async def query_many(self, queries: List[str]) -> List[List[MemoryContent]]:
+        """Like query() for several queries, with one batched vector search"""
+        vector_results = await self.vector.query_many(queries)
+        
+        results = []
+        for query, similar in zip(queries, vector_results):
+            lt_results = await self.long_term.query(query, limit=5)
+            
+            seen = set()
+            unique_results = []
+            for memory in similar + lt_results:
+                if memory.content not in seen:
+                    seen.add(memory.content)
+                    unique_results.append(memory)
+            results.append(unique_results)
+        
+        return results
+    
     async def get_context_for_query(self, query: str) -> List[MemoryContent]:
         context = []
         
@@ -79,32 +243,40 @@ class AgentMemorySystem(Memory):
             mime_type=MemoryMimeType.TEXT,
             metadata=metadata
         )
-        await self.vector.add(content)
-        await self.long_term.add(content, memory_type="semantic", importance=importance)
+        await self._persist([content], [content])
     
     async def clear_session(self) -> None:
         await self.session.clear()
     
     async def clear(self) -> None:
+        await self.flush()
         await self.session.clear()
         await self.vector.clear()
         await self.long_term.clear()
     
     async def close(self) -> None:
-        await self.session.close()
-        await self.vector.close()
-        await self.long_term.close()
+        """Close every loaded namespace, not only this view's"""
+        try:
+            if self._write_behind is not None:
+                try:
+                    await self._write_behind.close()
+                finally:
+                    await self._long_term_behind.close()
+        finally:
+            # A failed background write must not leave the stores open
+            await self._sessions.close()
+            await self._vectors.close()
+            await self._long_terms.close()
+            self.embedding_cache.close()
     
     async def update_context(self, model_context: Any) -> None:
         memory_parts = []
-        session_memories = await self.session.query("")
-        if session_memories:
-            recent = session_memories[-5:]
-            if recent:
-                session_text = "Recent conversation:\n"
-                for i, mem in enumerate(recent, 1):
-                    session_text += f"{i}. {mem.content}\n"
-                memory_parts.append(session_text)
+        recent = self.session.get_recent(n=5)
+        if recent:
+            session_text = "Recent conversation:\n"
+            for i, mem in enumerate(recent, 1):
+                session_text += f"{i}. {mem.content}\n"
+            memory_parts.append(session_text)
         
         important = await self.long_term.get_important_memories(min_importance=7, limit=5)
         if important:
@@ -117,14 +289,32 @@ class AgentMemorySystem(Memory):
             combined_text = "\nRelevant memory content:\n" + "\n".join(memory_parts)
             await model_context.add_message(UserMessage(content=combined_text,source="memory"))
     
-    def get_memory_stats(self) -> dict:
+    async def get_memory_stats(self) -> dict:
         """Get statistics from all memory stores"""
         return {
+            "namespace": self.namespace,
+            "loaded_namespaces": len(self._vectors),
+            "pending_writes": self._write_behind.pending() + self._long_term_behind.pending() if self._write_behind is not None else 0,
             "session": {
                 "size": len(self.session)
             },
             "vector": {
-                "size": len(self.vector)
+                "size": len(self.vector),
+                "index_type": self.vector.index_type,
+                "storage": self.vector.storage,
+                "embedding_cache": self.embedding_cache.stats()
             },
-            "long_term": self.long_term.get_stats()
+            "long_term": await self.long_term.get_stats()
+        }
+    
+    async def health(self) -> dict:
+        """Status and counters for monitoring, without scanning any store"""
+        long_term = await self.long_term.health()
+        return {
+            "status": long_term["status"],
+            "namespace": self.namespace,
+            "loaded_namespaces": len(self._vectors),
+            "session_size": len(self.session),
+            "vector_size": len(self.vector),
+            "long_term": long_term
         }
\ No newline at end of file
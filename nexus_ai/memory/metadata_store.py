@@ -0,0 +1,351 @@
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import struct
+import time
+import zlib
+import numpy as np
+from autogen_core.memory import MemoryContent, MemoryMimeType
+
+RECORD_DTYPE = np.dtype([
+    ("id", "<u8"),
+    ("offset", "<u8"),
+    ("length", "<u4"),
+    ("type", "u1"),
+    ("flags", "u1"),
+    ("importance", "<i2"),
+    ("timestamp", "<f8"),
+    ("expires_at", "<f8"),
+    ("last_access", "<f8"),
+    ("count", "<u4"),
+    ("category", "<u4")
+])
+RECORD_VERSION = 1
+
+MEMORY_TYPES = {"episodic": 1, "semantic": 2}
+
+FLAG_DELETED = 1
+
+_MAGIC = b"NXREC"
+_HEADER = struct.Struct("<5sBH")
+
+
+def category_code(category: Optional[str]) -> int:
+    """Fixed-width stand-in for a category name; 0 means none"""
+    if not category:
+        return 0
+    return zlib.crc32(str(category).lower().encode("utf-8")) or 1
+
+
+class MemoryFilter:
+    """Predicates on record fields, applied as a row mask inside the vector search"""
+    
+    def __init__(
+        self,
+        memory_type: Optional[str] = None,
+        category: Optional[str] = None,
+        min_importance: Optional[int] = None,
+        max_importance: Optional[int] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ):
+        if memory_type is not None and memory_type not in MEMORY_TYPES:
+            raise ValueError(f"Unknown memory_type: {memory_type}")
+        
+        self.memory_type = memory_type
+        self.category = category
+        self.min_importance = min_importance
+        self.max_importance = max_importance
+        self.since = since
+        self.until = until
+    
+    def mask(self, records: np.ndarray) -> np.ndarray:
+        mask = np.ones(len(records), dtype=bool)
+        if self.memory_type is not None:
+            mask &= records["type"] == MEMORY_TYPES[self.memory_type]
+        if self.category is not None:
+            mask &= records["category"] == category_code(self.category)
+        if self.min_importance is not None:
+            mask &= records["importance"] >= self.min_importance
+        if self.max_importance is not None:
+            mask &= records["importance"] <= self.max_importance
+        # Timestamps are refreshed when a duplicate is folded into the row
+        if self.since is not None:
+            mask &= records["timestamp"] >= self.since
+        if self.until is not None:
+            mask &= records["timestamp"] < self.until
+        return mask
+    
+    def matches(self, content: MemoryContent) -> bool:
+        """Exact check for what the mask can only approximate: category names that share a code"""
+        if self.category is None:
+            return True
+        category = (content.metadata or {}).get("category")
+        return category is not None and str(category).lower() == str(self.category).lower()
+
+
+class MetadataStore:
+    """Row metadata for a vector index: serialized contents in an append-only
+    text file plus one fixed-width, memory-mapped record per row. A read-only
+    store maps the files of another process's writer and never changes them."""
+    
+    def __init__(self, path: Optional[str] = None, read_only: bool = False):
+        self._path = path
+        self._read_only = read_only
+        self._count = 0
+        
+        if path is None:
+            self._text = bytearray()
+            self._records = np.zeros(16, dtype=RECORD_DTYPE)
+            return
+        
+        self._text_path = f"{path}.text"
+        self._records_path = f"{path}.rec"
+        self._open()
+    
+    def append_many(
+        self,
+        contents: List[MemoryContent],
+        ids: np.ndarray,
+        expires_at: np.ndarray
+    ) -> None:
+        if not contents:
+            return
+        
+        payloads = [self._encode(content) for content in contents]
+        records = np.zeros(len(contents), dtype=RECORD_DTYPE)
+        offset = self._text_size()
+        now = time.time()
+        
+        for i, (content, payload) in enumerate(zip(contents, payloads)):
+            metadata = content.metadata or {}
+            records[i]["id"] = ids[i]
+            records[i]["offset"] = offset
+            records[i]["length"] = len(payload)
+            records[i]["type"] = MEMORY_TYPES.get(metadata.get("type"), 0)
+            records[i]["importance"] = int(metadata.get("importance", 0) or 0)
+            records[i]["timestamp"] = now
+            records[i]["expires_at"] = expires_at[i]
+            records[i]["count"] = 1
+            records[i]["category"] = category_code(metadata.get("category"))
+            offset += len(payload)
+        
+        if self._path is None:
+            self._text.extend(b"".join(payloads))
+            needed = self._count + len(records)
+            if needed > len(self._records):
+                grown = np.zeros(max(needed, 2 * len(self._records)), dtype=RECORD_DTYPE)
+                grown[:self._count] = self._records[:self._count]
+                self._records = grown
+            self._records[self._count:needed] = records
+        else:
+            self._text_file.seek(0, os.SEEK_END)
+            self._text_file.write(b"".join(payloads))
+            self._records_file.seek(_HEADER.size + self._count * RECORD_DTYPE.itemsize)
+            self._records_file.write(records.tobytes())
+            self._text_file.flush()
+            self._records_file.flush()
+        
+        self._count += len(records)
+    
+    def get(self, row: int) -> MemoryContent:
+        record = self.records[row]
+        data = json.loads(self._read_payload(int(record["offset"]), int(record["length"])))
+        
+        metadata = data["metadata"] or {}
+        metadata["memory_id"] = int(record["id"])
+        if record["count"] > 1:
+            # Duplicates folded into this row may have raised its importance
+            metadata["occurrences"] = int(record["count"])
+            metadata["importance"] = int(record["importance"])
+        return MemoryContent(
+            content=data["content"],
+            mime_type=data["mime_type"],
+            metadata=metadata
+        )
+    
+    @property
+    def records(self) -> np.ndarray:
+        """Fixed-width records for every row; writes through to disk when persisted"""
+        if self._path is None:
+            return self._records[:self._count]
+        
+        if self._records is None or len(self._records) != self._count:
+            if self._count == 0:
+                return np.zeros(0, dtype=RECORD_DTYPE)
+            self._records = np.memmap(
+                self._records_path,
+                dtype=RECORD_DTYPE,
+                mode="r" if self._read_only else "r+",
+                offset=_HEADER.size,
+                shape=(self._count,)
+            )
+        return self._records
+    
+    def rows_for_ids(self, ids: List[int]) -> np.ndarray:
+        return np.flatnonzero(np.isin(self.records["id"], np.asarray(ids, dtype="uint64")))
+    
+    def live_mask(self, now: Optional[float] = None) -> np.ndarray:
+        records = self.records
+        now = time.time() if now is None else now
+        alive = (records["flags"] & FLAG_DELETED) == 0
+        return alive & ((records["expires_at"] == 0) | (records["expires_at"] > now))
+    
+    def mark_deleted(self, rows: np.ndarray) -> None:
+        if len(rows):
+            self.records["flags"][rows] |= FLAG_DELETED
+    
+    def touch(self, rows: List[int], now: Optional[float] = None) -> None:
+        # Access times are the writer's to record; the shared pages stay clean in readers
+        if rows and not self._read_only:
+            self.records["last_access"][rows] = time.time() if now is None else now
+    
+    def bumped(self, rows: np.ndarray, importance: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Counts and importances `rows` will hold after a repeat sighting each, without writing them"""
+        unique, inverse = np.unique(rows, return_inverse=True)
+        count = np.array(self.records["count"][unique])
+        np.add.at(count, inverse, 1)
+        highest = np.array(self.records["importance"][unique])
+        np.maximum.at(highest, inverse, np.asarray(importance, dtype="int16"))
+        return unique, count, highest
+    
+    def set_bumped(self, rows: np.ndarray, count: np.ndarray, importance: np.ndarray, timestamp: float) -> None:
+        """Write absolute values from bumped(), so replaying them twice is harmless"""
+        if not len(rows):
+            return
+        
+        records = self.records
+        records["count"][rows] = count
+        records["importance"][rows] = importance
+        records["timestamp"][rows] = timestamp
+    
+    def compact(self, rows: np.ndarray, tmp_suffix: str = ".tmp") -> List[Tuple[str, str]]:
+        """Keep only `rows`; when persisted, returns (temp, final) paths for the caller to rename into place"""
+        kept = np.array(self.records[rows])
+        payloads = [self._read_payload(int(r["offset"]), int(r["length"])) for r in kept]
+        kept["offset"] = np.cumsum([0] + [len(p) for p in payloads])[:-1]
+        
+        if self._path is None:
+            self._text = bytearray(b"".join(payloads))
+            self._records = np.zeros(max(16, len(kept)), dtype=RECORD_DTYPE)
+            self._records[:len(kept)] = kept
+            self._count = len(kept)
+            return []
+        
+        text_tmp = f"{self._text_path}{tmp_suffix}"
+        records_tmp = f"{self._records_path}{tmp_suffix}"
+        with open(text_tmp, "wb") as f:
+            f.write(b"".join(payloads))
+            f.flush()
+            os.fsync(f.fileno())
+        with open(records_tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, RECORD_VERSION, RECORD_DTYPE.itemsize))
+            f.write(kept.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        return [(text_tmp, self._text_path), (records_tmp, self._records_path)]
+    
+    def reopen(self) -> None:
+        if self._path is not None:
+            self.close()
+            self._open()
+    
+    def truncate(self, count: int) -> None:
+        if count >= self._count:
+            return
+        
+        text_end = int(self.records[count]["offset"])
+        if self._read_only:
+            # Rows past the writer's last checkpoint are ignored, never cut off
+            self._records = None
+        elif self._path is None:
+            del self._text[text_end:]
+        else:
+            self._records = None
+            self._text_file.truncate(text_end)
+            self._records_file.truncate(_HEADER.size + count * RECORD_DTYPE.itemsize)
+        self._count = count
+    
+    def flush(self) -> None:
+        if self._path is None or self._read_only:
+            return
+        
+        if isinstance(self._records, np.memmap):
+            self._records.flush()
+        for f in (self._text_file, self._records_file):
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def clear(self) -> None:
+        self.truncate(0)
+    
+    def close(self) -> None:
+        if self._path is None:
+            return
+        
+        self.flush()
+        self._records = None
+        if self._text_file is not None:
+            self._text_file.close()
+            self._records_file.close()
+    
+    def _open(self) -> None:
+        self._records: Optional[np.memmap] = None
+        if self._read_only:
+            # Creating the files is left to the writer
+            if not os.path.exists(self._records_path):
+                self._text_file = self._records_file = None
+                self._count = 0
+                return
+            mode = "rb"
+        else:
+            if not os.path.exists(self._text_path):
+                open(self._text_path, "wb").close()
+            self._check_records()
+            mode = "r+b"
+        
+        self._text_file = open(self._text_path, mode)
+        self._records_file = open(self._records_path, mode)
+        self._count = (os.path.getsize(self._records_path) - _HEADER.size) // RECORD_DTYPE.itemsize
+    
+    def _check_records(self) -> None:
+        """Create the records file, or make sure an existing one has this layout"""
+        if not os.path.exists(self._records_path):
+            with open(self._records_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, RECORD_VERSION, RECORD_DTYPE.itemsize))
+            return
+        
+        with open(self._records_path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size or _HEADER.unpack(header) != (_MAGIC, RECORD_VERSION, RECORD_DTYPE.itemsize):
+            raise ValueError(f"Unsupported records file: {self._records_path}")
+    
+    def _read_payload(self, offset: int, length: int) -> bytes:
+        if self._path is None:
+            return bytes(self._text[offset:offset + length])
+        return os.pread(self._text_file.fileno(), length, offset)
+    
+    def _text_size(self) -> int:
+        if self._path is None:
+            return len(self._text)
+        self._text_file.seek(0, os.SEEK_END)
+        return self._text_file.tell()
+    
+    @staticmethod
+    def _encode(content: MemoryContent) -> bytes:
+        mime_type = content.mime_type.value if isinstance(content.mime_type, MemoryMimeType) else content.mime_type
+        metadata = dict(content.metadata) if content.metadata else None
+        if metadata:
+            # Per-query annotations added by FAISSVectorMemory.query are not part of the row
+            metadata.pop("memory_id", None)
+            metadata.pop("similarity_score", None)
+            metadata.pop("occurrences", None)
+        data: Dict[str, Any] = {
+            "content": content.content,
+            "mime_type": mime_type,
+            "metadata": metadata
+        }
+        return json.dumps(data, default=str).encode("utf-8")
+    
+    def __len__(self) -> int:
+        return self._count
\ No newline at end of file
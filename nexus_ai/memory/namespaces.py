@@ -0,0 +1,67 @@
+from typing import Callable, Dict, Generic, List, Optional, TypeVar
+import os
+import re
+import time
+
+T = TypeVar("T")
+
+_NAMESPACE_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def namespaced_path(path: Optional[str], namespace: Optional[str]) -> Optional[str]:
+    """Per-namespace variant of a storage path: data/store.faiss -> data/store.<namespace>.faiss"""
+    if path is None or namespace is None:
+        return path
+    if not _NAMESPACE_PATTERN.match(namespace):
+        raise ValueError(f"Invalid namespace: {namespace!r}")
+    # Every connection to ":memory:" is a private database already; renaming it would create a file
+    if path == ":memory:":
+        return path
+    
+    root, ext = os.path.splitext(path)
+    return f"{root}.{namespace}{ext}"
+
+
+class NamespacePool(Generic[T]):
+    """Stores keyed by namespace, created on first use and closable once idle"""
+    
+    def __init__(self, factory: Callable[[Optional[str]], T], evictable: bool = True):
+        self._factory = factory
+        self._evictable = evictable
+        self._stores: Dict[Optional[str], T] = {}
+        self._last_used: Dict[Optional[str], float] = {}
+    
+    def get(self, namespace: Optional[str]) -> T:
+        store = self._stores.get(namespace)
+        if store is None:
+            store = self._factory(namespace)
+            self._stores[namespace] = store
+        self._last_used[namespace] = time.monotonic()
+        return store
+    
+    def loaded(self) -> List[Optional[str]]:
+        return list(self._stores)
+    
+    async def evict_idle(self, max_idle: float, keep: Optional[List[Optional[str]]] = None) -> List[Optional[str]]:
+        """Close and drop namespaces unused for `max_idle` seconds; they reload from disk on next use"""
+        if not self._evictable:
+            return []
+        
+        now = time.monotonic()
+        evicted = [
+            namespace for namespace, last_used in self._last_used.items()
+            if now - last_used >= max_idle and namespace not in (keep or [])
+        ]
+        for namespace in evicted:
+            await self._stores.pop(namespace).close()
+            del self._last_used[namespace]
+        return evicted
+    
+    async def close(self) -> None:
+        for store in self._stores.values():
+            await store.close()
+        self._stores.clear()
+        self._last_used.clear()
+    
+    def __len__(self) -> int:
+        return len(self._stores)
\ No newline at end of file
@@ -0,0 +1,214 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from autogen_core.memory import MemoryContent
+from nexus_ai.memory.namespaces import namespaced_path
+from nexus_ai.memory.session_memory import SessionMemory
+from nexus_ai.memory.sqlite_executor import SQLiteExecutor
+
+
+class SessionManager:
+    """SessionMemory per session_id. Active sessions stay in RAM within
+    `max_sessions` and `max_resident_tokens`; beyond that, or once idle, the
+    least recently used are spilled to SQLite as compressed JSON and restored
+    on the session's next request."""
+    
+    def __init__(
+        self,
+        spill_path: str = "sessions.db",
+        max_turns: int = 50,
+        max_sessions: int = 1000,
+        max_resident_tokens: int = 4_000_000,
+        idle_timeout: float = 900.0,
+        namespace: Optional[str] = None
+    ):
+        self.namespace = namespace
+        self.spill_path = namespaced_path(spill_path, namespace)
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.max_resident_tokens = max_resident_tokens
+        self.idle_timeout = idle_timeout
+        
+        self._active: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._loading: Dict[str, "asyncio.Future[None]"] = {}
+        # Sessions with a request in flight; never spilled, or the request would write to a stale copy
+        self._pinned: Dict[str, int] = {}
+        self._resident_tokens = 0
+        
+        # Spills and restores both go through the writer queue, so a restore
+        # always sees a spill of the same session that was queued before it
+        self._db = SQLiteExecutor(self._connect, readers=0)
+        self._db.submit_write(self._init_db).result()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.spill_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    @staticmethod
+    def _init_db(conn: sqlite3.Connection) -> None:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS spilled_sessions (
+                session_id TEXT PRIMARY KEY,
+                turns BLOB NOT NULL,
+                spilled_at REAL NOT NULL
+            )
+        """)
+    
+    async def get(self, session_id: str) -> SessionMemory:
+        """The session's memory, restored from disk if it was spilled. It is not
+        pinned once returned: after the next await it may have been spilled, and
+        turns added to it then are lost. Use session() to hold it across awaits."""
+        self._pin(session_id)
+        try:
+            return await self._get(session_id)
+        finally:
+            self._unpin(session_id)
+    
+    @asynccontextmanager
+    async def session(self, session_id: str) -> AsyncIterator[SessionMemory]:
+        """The session's memory, kept resident until the block exits"""
+        self._pin(session_id)
+        try:
+            yield await self._get(session_id)
+        finally:
+            self._unpin(session_id)
+            # Limits skipped this session while it was pinned
+            await self._enforce_limits()
+    
+    async def add(self, session_id: str, content: MemoryContent) -> None:
+        self._pin(session_id)
+        try:
+            session = await self._get(session_id)
+            before = session.token_count
+            await session.add(content)
+            self._resident_tokens += session.token_count - before
+        finally:
+            self._unpin(session_id)
+        await self._enforce_limits()
+    
+    async def _get(self, session_id: str) -> SessionMemory:
+        if session_id not in self._active:
+            loading = self._loading.get(session_id)
+            if loading is None:
+                # Concurrent requests for the same spilled session share one restore
+                loading = asyncio.ensure_future(self._restore(session_id))
+                self._loading[session_id] = loading
+                loading.add_done_callback(lambda _: self._loading.pop(session_id, None))
+            await loading
+        
+        self._touch(session_id)
+        return self._active[session_id]
+    
+    def _pin(self, session_id: str) -> None:
+        self._pinned[session_id] = self._pinned.get(session_id, 0) + 1
+    
+    def _unpin(self, session_id: str) -> None:
+        self._pinned[session_id] -= 1
+        if not self._pinned[session_id]:
+            del self._pinned[session_id]
+    
+    async def evict_idle(self, max_idle: Optional[float] = None) -> List[str]:
+        """Spill sessions unused for `max_idle` seconds (default: idle_timeout)"""
+        max_idle = self.idle_timeout if max_idle is None else max_idle
+        now = time.monotonic()
+        idle = [
+            session_id for session_id, last_used in self._last_used.items()
+            if now - last_used >= max_idle and session_id not in self._pinned
+        ]
+        for session_id in idle:
+            await self._spill(session_id)
+        
+        # Adds made directly on a SessionMemory bypass add(); resynchronize the total here
+        self._resident_tokens = sum(session.token_count for session in self._active.values())
+        return idle
+    
+    async def drop(self, session_id: str) -> None:
+        """Forget a session, in RAM and on disk"""
+        # A restore still in flight would put the session back after it is dropped
+        loading = self._loading.get(session_id)
+        if loading is not None:
+            await loading
+        
+        session = self._active.pop(session_id, None)
+        self._last_used.pop(session_id, None)
+        if session is not None:
+            self._resident_tokens -= session.token_count
+        await self._db.write(lambda conn: conn.execute("DELETE FROM spilled_sessions WHERE session_id = ?", (session_id,)))
+    
+    async def close(self) -> None:
+        """Spill every active session so none are lost, then close the store"""
+        for session_id in list(self._active):
+            await self._spill(session_id)
+        await self._db.close()
+    
+    async def stats(self) -> Dict[str, Any]:
+        spilled = await self._db.read(
+            lambda conn: conn.execute("SELECT COUNT(*) FROM spilled_sessions").fetchone()[0]
+        )
+        return {
+            "active_sessions": len(self._active),
+            "resident_tokens": self._resident_tokens,
+            "spilled_sessions": spilled
+        }
+    
+    def _touch(self, session_id: str) -> None:
+        self._active.move_to_end(session_id)
+        self._last_used[session_id] = time.monotonic()
+    
+    async def _enforce_limits(self) -> None:
+        while len(self._active) > self.max_sessions or self._resident_tokens > self.max_resident_tokens:
+            # Least recently used first; if every session is in use, the caps are exceeded until they finish
+            session_id = next((session_id for session_id in self._active if session_id not in self._pinned), None)
+            if session_id is None:
+                break
+            await self._spill(session_id)
+    
+    async def _spill(self, session_id: str) -> None:
+        session = self._active.pop(session_id, None)
+        self._last_used.pop(session_id, None)
+        if session is None:
+            return
+        
+        self._resident_tokens -= session.token_count
+        turns = session.snapshot()
+        if not turns:
+            await self._db.write(lambda conn: conn.execute("DELETE FROM spilled_sessions WHERE session_id = ?", (session_id,)))
+            return
+        
+        def write(conn: sqlite3.Connection) -> None:
+            payload = zlib.compress(json.dumps(turns, separators=(",", ":"), default=str).encode("utf-8"))
+            conn.execute(
+                "INSERT OR REPLACE INTO spilled_sessions (session_id, turns, spilled_at) VALUES (?, ?, ?)",
+                (session_id, payload, time.time())
+            )
+        
+        await self._db.write(write)
+    
+    async def _restore(self, session_id: str) -> None:
+        def load(conn: sqlite3.Connection) -> Optional[List[Dict[str, Any]]]:
+            row = conn.execute("SELECT turns FROM spilled_sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM spilled_sessions WHERE session_id = ?", (session_id,))
+            return json.loads(zlib.decompress(row[0]))
+        
+        turns = await self._db.write(load)
+        session = SessionMemory(max_turns=self.max_turns, namespace=self.namespace)
+        if turns:
+            session.restore(turns)
+        
+        self._active[session_id] = session
+        self._last_used[session_id] = time.monotonic()
+        self._resident_tokens += session.token_count
+        await self._enforce_limits()
+    
+    def __len__(self) -> int:
+        return len(self._active)
\ No newline at end of file
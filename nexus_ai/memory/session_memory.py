@@ -1,29 +1,54 @@
-from typing import List, Any
-from autogen_core.memory import Memory, MemoryContent
+from typing import Callable, Deque, Dict, List, Any, Optional
+from collections import deque
+from itertools import islice
+from autogen_core.memory import Memory, MemoryContent, MemoryMimeType
 from datetime import datetime
 
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for English text under common BPE tokenizers
+    return max(1, (len(text) + 3) // 4)
+
+
 class SessionMemory(Memory):
     
-    def __init__(self, max_turns: int = 50):
+    def __init__(
+        self,
+        max_turns: int = 50,
+        namespace: Optional[str] = None,
+        count_tokens: Callable[[str], int] = estimate_tokens
+    ):
         
-        self._memory: List[MemoryContent] = []
+        self.namespace = namespace
+        # Fixed-capacity ring buffers: appending past max_turns drops the oldest turn in O(1)
+        self._memory: Deque[MemoryContent] = deque(maxlen=max_turns)
+        self._tokens: Deque[int] = deque(maxlen=max_turns)
         self._max_turns = max_turns
-        
+        self._count_tokens = count_tokens
+        self._token_total = 0
+    
     async def add(self, content: MemoryContent) -> None:
         if content.metadata is None:
             content.metadata = {}
         content.metadata["timestamp"] = datetime.now().isoformat()
         
+        # Measured once here so get_window never re-tokenizes a turn
+        self._append(content, self._count_tokens(str(content.content)))
+    
+    def _append(self, content: MemoryContent, tokens: int) -> None:
+        if len(self._tokens) == self._tokens.maxlen:
+            self._token_total -= self._tokens[0]
         self._memory.append(content)
-        
-        if len(self._memory) > self._max_turns:
-            self._memory = self._memory[-self._max_turns:]
+        self._tokens.append(tokens)
+        self._token_total += tokens
     
     async def query(self, query: str) -> List[MemoryContent]:
-        return self._memory.copy()
+        return list(self._memory)
     
     async def clear(self) -> None:
         self._memory.clear()
+        self._tokens.clear()
+        self._token_total = 0
     
     async def close(self) -> None:
         pass
@@ -32,7 +57,43 @@ class SessionMemory(Memory):
         pass
     
     def get_recent(self, n: int = 5) -> List[MemoryContent]:
-        return self._memory[-n:] if n < len(self._memory) else self._memory.copy()
+        recent = list(islice(reversed(self._memory), max(n, 0)))
+        recent.reverse()
+        return recent
+    
+    def get_window(self, max_tokens: int) -> List[MemoryContent]:
+        """Newest turns, oldest first, whose combined token counts fit within `max_tokens`"""
+        window = []
+        used = 0
+        for content, tokens in zip(reversed(self._memory), reversed(self._tokens)):
+            if used + tokens > max_tokens:
+                break
+            used += tokens
+            window.append(content)
+        window.reverse()
+        return window
+    
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Turns as JSON-ready dicts, oldest first, with their cached token counts"""
+        return [
+            {
+                "content": content.content,
+                "mime_type": content.mime_type.value if isinstance(content.mime_type, MemoryMimeType) else content.mime_type,
+                "metadata": content.metadata,
+                "tokens": tokens
+            }
+            for content, tokens in zip(self._memory, self._tokens)
+        ]
+    
+    def restore(self, turns: List[Dict[str, Any]]) -> None:
+        """Append turns from snapshot(), keeping their timestamps and token counts"""
+        for turn in turns:
+            content = MemoryContent(content=turn["content"], mime_type=turn["mime_type"], metadata=turn["metadata"])
+            self._append(content, turn["tokens"])
+    
+    @property
+    def token_count(self) -> int:
+        return self._token_total
     
     def __len__(self) -> int:
         return len(self._memory)
\ No newline at end of file
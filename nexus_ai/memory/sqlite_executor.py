@@ -0,0 +1,103 @@
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+import asyncio
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+T = TypeVar("T")
+
+
+class SQLiteExecutor:
+    """Runs SQLite work off the event loop: writes in submission order on one
+    writer thread, reads in parallel on a pool of reader threads, each with its
+    own connection. Work is a function taking the connection."""
+    
+    def __init__(self, connect: Callable[[], sqlite3.Connection], readers: int = 4):
+        self._connect = connect
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        
+        self._requests: "queue.Queue[Optional[Tuple[Callable[[sqlite3.Connection], Any], Future]]]" = queue.Queue()
+        self._writer_connection = self._open()
+        self._writer = threading.Thread(target=self._run_writer, name="sqlite-writer", daemon=True)
+        self._writer.start()
+        
+        # Separate connections to an in-memory database would see separate databases
+        self._readers = ThreadPoolExecutor(readers, thread_name_prefix="sqlite-reader") if readers > 0 else None
+        self._closed = False
+    
+    def submit_write(self, fn: Callable[[sqlite3.Connection], T]) -> "Future[T]":
+        """Queue `fn`; it runs in its own transaction, committed when it returns and rolled back if it raises"""
+        if self._closed:
+            raise RuntimeError("SQLiteExecutor is closed")
+        
+        future: Future = Future()
+        self._requests.put((fn, future))
+        return future
+    
+    def submit_read(self, fn: Callable[[sqlite3.Connection], T]) -> "Future[T]":
+        if self._readers is None:
+            return self.submit_write(fn)
+        if self._closed:
+            raise RuntimeError("SQLiteExecutor is closed")
+        return self._readers.submit(self._run_reader, fn)
+    
+    async def write(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        return await asyncio.wrap_future(self.submit_write(fn))
+    
+    async def read(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        return await asyncio.wrap_future(self.submit_read(fn))
+    
+    async def close(self) -> None:
+        """Finish queued work, then close every connection"""
+        if self._closed:
+            return
+        
+        self._closed = True
+        self._requests.put(None)
+        await asyncio.get_running_loop().run_in_executor(None, self._shutdown)
+    
+    def _shutdown(self) -> None:
+        self._writer.join()
+        if self._readers is not None:
+            self._readers.shutdown(wait=True)
+        
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+    
+    def _open(self) -> sqlite3.Connection:
+        # Each connection is only used by the thread it belongs to, but is closed from _shutdown
+        conn = self._connect()
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+    
+    def _run_writer(self) -> None:
+        conn = self._writer_connection
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            
+            fn, future = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            
+            try:
+                result = fn(conn)
+                conn.commit()
+            except BaseException as e:
+                conn.rollback()
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+    
+    def _run_reader(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        return fn(conn)
\ No newline at end of file
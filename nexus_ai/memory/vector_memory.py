@@ -1,8 +1,23 @@
-from typing import List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import faiss
+import numpy as np
 from autogen_core.memory import Memory, MemoryContent
-from sentence_transformers import SentenceTransformer
+from nexus_ai.memory.write_ahead_log import WriteAheadLog, WriteInbox
+from nexus_ai.memory.encoder_registry import get_encoder
+from nexus_ai.memory.metadata_store import MetadataStore, MemoryFilter
+from nexus_ai.memory.exact_vectors import ExactVectors
+from nexus_ai.memory.embedding_cache import EmbeddingCache
+from nexus_ai.memory.embedding_executor import EmbeddingExecutor
+from nexus_ai.memory.namespaces import namespaced_path
+from nexus_ai.memory.eviction import EVICTION_POLICIES, EvictionPolicy
+from nexus_ai.memory.index_tiers import INDEX_TYPES, STORAGE_TYPES, index_type_of, storage_of, min_training_rows, build_index, configure_search, truncate_index, rebuild_index, all_vectors, read_index_mmap, merge_search, search_index
+import asyncio
+import fcntl
+import glob
 import pickle
+import threading
+import time
+import uuid
 import os
 
 class FAISSVectorMemory(Memory):
@@ -11,95 +26,897 @@ class FAISSVectorMemory(Memory):
         embedding_model: str = "all-MiniLM-L6-v2",
         k: int = 5,
         score_threshold: float = 0.3,
-        persist_path: Optional[str] = None
+        persist_path: Optional[str] = None,
+        persist_mode: str = "snapshot",
+        checkpoint_every: int = 100,
+        checkpoint_interval: float = 60.0,
+        index_type: str = "flat",
+        promote_at: int = 10000,
+        nlist: Optional[int] = None,
+        pq_m: int = 48,
+        hnsw_m: int = 32,
+        nprobe: int = 8,
+        ef_search: int = 64,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        executor: Optional[EmbeddingExecutor] = None,
+        mmap: bool = False,
+        max_entries: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        eviction_policy: Union[str, EvictionPolicy] = "oldest",
+        dedup_threshold: Optional[float] = None,
+        namespace: Optional[str] = None,
+        storage: str = "float32",
+        rerank: int = 0
     ):
-        self._encoder = SentenceTransformer(embedding_model)
+        if persist_mode not in ("snapshot", "wal"):
+            raise ValueError(f"Unknown persist_mode: {persist_mode}")
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index_type: {index_type}")
+        if storage not in STORAGE_TYPES:
+            raise ValueError(f"Unknown storage: {storage}")
+        if isinstance(eviction_policy, str) and eviction_policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction_policy: {eviction_policy}")
+        
+        # Each namespace is a separate shard with its own files
+        self.namespace = namespace
+        persist_path = namespaced_path(persist_path, namespace)
+        
+        self._encoder = get_encoder(embedding_model)
+        self._embedding_model = embedding_model
+        self._embedding_cache = embedding_cache if embedding_cache is not None else EmbeddingCache()
+        self._executor = executor
+        self._index_lock = threading.Lock()
         self._k = k
         self._score_threshold = score_threshold
         self._persist_path = persist_path
+        self._checkpoint_every = checkpoint_every
+        self._checkpoint_interval = checkpoint_interval
+        self._index_type = index_type
+        self._promote_at = promote_at
+        self._nlist = nlist
+        self._pq_m = pq_m
+        self._hnsw_m = hnsw_m
+        self._nprobe = nprobe
+        self._ef_search = ef_search
+        self._mmap = mmap
+        self._storage = storage
+        self._rerank = rerank
+        self._max_entries = max_entries
+        self._default_ttl = default_ttl
+        self._eviction_policy = EVICTION_POLICIES[eviction_policy] if isinstance(eviction_policy, str) else eviction_policy
+        self._dedup_threshold = dedup_threshold
+        
+        # Created from the first embeddings seen, so construction never loads the model
+        self._index: Optional[faiss.Index] = None
+        
+        # In mmap mode the persisted index is read-only; new rows land in this
+        # in-RAM delta until the next checkpoint merges them into the file
+        self._mapped = False
+        self._delta: Optional[faiss.Index] = None
         
-        self._dimension = self._encoder.get_sentence_embedding_dimension()
+        # One process per store writes; any other opens it read-only and
+        # follows the checkpoints the writer publishes
+        self._lock_file = None
+        self._read_only = bool(persist_path) and not self._lock_writer()
+        self._followed: Optional[Tuple[int, int]] = None
         
-        self._index = faiss.IndexFlatL2(self._dimension)
+        # A read-only process logs its adds to an inbox the writer merges at its next
+        # checkpoint, and searches them in this in-RAM delta until that checkpoint lands
+        self._inbox: Optional[WriteInbox] = None
+        self._inbox_name = uuid.uuid4().hex
+        self._inbox_seq = 0
+        if self._read_only:
+            self._inbox = WriteInbox(f"{persist_path}.inbox.{self._inbox_name}")
+        self._local_metadata = MetadataStore()
+        self._local_vectors: Optional[np.ndarray] = None
+        self._local_seqs = np.zeros(0, dtype="int64")
+        # Writer side: last inbox record merged, per inbox
+        self._inbox_seqs: Dict[str, int] = {}
         
-        self._contents: List[MemoryContent] = []
+        self._metadata = MetadataStore(persist_path, read_only=self._read_only)
         
-        if persist_path and os.path.exists(persist_path):
+        # With rerank > 1 the search fetches rerank * k candidates from the
+        # (compressed) index and orders them by their full-precision vectors
+        self._exact: Optional[ExactVectors] = None
+        if rerank > 1:
+            self._exact = ExactVectors(f"{persist_path}.vec" if persist_path else None, read_only=self._read_only)
+        self._next_id = 0
+        
+        self._seq = 0
+        self._generation = 0
+        # Bumped whenever rows are renumbered, so a promotion built from an older snapshot is discarded
+        self._compactions = 0
+        self._promoting = False
+        self._pending = 0
+        self._last_checkpoint = time.monotonic()
+        self._wal = WriteAheadLog(f"{persist_path}.wal") if persist_path and persist_mode == "wal" and not self._read_only else None
+        
+        if self._read_only:
+            # Nothing is visible before the writer's first checkpoint, however much it has appended
+            self._metadata.truncate(0)
+            if self._exact is not None:
+                self._exact.truncate(0)
+            self._follow()
+        elif persist_path:
             self._load()
+        
+        if self._index is not None:
+            configure_search(self._index, nprobe=self._nprobe, ef_search=self._ef_search)
     
     async def add(self, content: MemoryContent) -> None:
-        text = content.content
-        embedding = self._encoder.encode([text], convert_to_numpy=True)
+        await self.add_many([content])
+    
+    async def add_many(
+        self,
+        contents: List[MemoryContent],
+        ttl: Optional[float] = None,
+        dedup_threshold: Optional[float] = None
+    ) -> List[int]:
+        """Add contents and return their ids; an item at least `dedup_threshold` cosine-similar to a live entry is folded into it and gets its id.
+        In a read-only process the writer assigns ids when it merges the rows, and -1 is returned for each."""
+        if not contents:
+            return []
         
-        faiss.normalize_L2(embedding)
+        embeddings = await self._embed([content.content for content in contents])
+        threshold = dedup_threshold if dedup_threshold is not None else self._dedup_threshold
+        expires_at = self._expiry(contents, ttl)
         
-        self._index.add(embedding)
+        if self._read_only:
+            return await self._offload(self._queue_rows, embeddings, contents, expires_at)
         
-        self._contents.append(content)
+        # The dedup search, log fsync and checkpoints take tens of milliseconds; keep them off the loop
+        ids, promote = await self._offload(self._add_rows, embeddings, contents, expires_at, threshold)
         
-        if self._persist_path:
-            self._save()
+        if promote:
+            await self._promote()
+        
+        return ids.tolist()
     
-    async def query(self, query: str) -> List[MemoryContent]:
-        if len(self._contents) == 0:
-            return []
+    def _add_rows(
+        self,
+        embeddings: np.ndarray,
+        contents: List[MemoryContent],
+        expires_at: np.ndarray,
+        threshold: Optional[float]
+    ) -> Tuple[np.ndarray, bool]:
+        with self._index_lock:
+            ids = self._insert_rows(embeddings, contents, expires_at, threshold)
+            self._evict_over_capacity()
+            
+            promote = self._promotion_due()
+            
+            if self._wal is not None:
+                self._pending += len(contents)
+                if self._checkpoint_due():
+                    self._save()
+            elif self._persist_path:
+                self._save()
+            else:
+                self._compact_if_sparse()
         
-        query_embedding = self._encoder.encode([query], convert_to_numpy=True)
-        faiss.normalize_L2(query_embedding)
+        return ids, promote
+    
+    def _insert_rows(
+        self,
+        embeddings: np.ndarray,
+        contents: List[MemoryContent],
+        expires_at: np.ndarray,
+        threshold: Optional[float]
+    ) -> np.ndarray:
+        if threshold is None:
+            fresh = np.arange(len(contents))
+            duplicate_rows = np.full(len(contents), -1)
+        else:
+            fresh, duplicate_rows = self._find_duplicates(embeddings, threshold)
         
-        k = min(self._k, len(self._contents))
-        distances, indices = self._index.search(query_embedding, k)
+        ids = np.zeros(len(contents), dtype="uint64")
+        if len(fresh):
+            ids[fresh] = np.arange(self._next_id, self._next_id + len(fresh), dtype="uint64")
+            fresh_contents = [contents[i] for i in fresh]
+            
+            if self._wal is not None:
+                self._wal.append(("add", self._seq + 1, embeddings[fresh], fresh_contents, ids[fresh], expires_at[fresh]))
+            self._seq += 1
+            
+            self._append(embeddings[fresh], fresh_contents, ids[fresh], expires_at[fresh])
         
-        similarities = 1 - (distances[0] ** 2) / 2
+        duplicates = np.flatnonzero(duplicate_rows >= 0)
+        if len(duplicates):
+            ids[duplicates] = self._metadata.records["id"][duplicate_rows[duplicates]]
+            importance = [int((contents[i].metadata or {}).get("importance", 0) or 0) for i in duplicates]
+            self._bump_rows(duplicate_rows[duplicates], np.array(importance))
+        return ids
+    
+    def _queue_rows(self, embeddings: np.ndarray, contents: List[MemoryContent], expires_at: np.ndarray) -> List[int]:
+        with self._index_lock:
+            self._inbox_seq += 1
+            self._inbox.append((self._inbox_seq, embeddings, contents, expires_at))
+            
+            self._local_metadata.append_many(contents, np.zeros(len(contents), dtype="uint64"), expires_at)
+            self._local_vectors = embeddings if self._local_vectors is None else np.concatenate([self._local_vectors, embeddings])
+            self._local_seqs = np.concatenate([self._local_seqs, np.full(len(contents), self._inbox_seq)])
+        return [-1] * len(contents)
+    
+    async def delete(self, ids: List[int]) -> int:
+        """Remove entries by id; their rows are dropped from disk at the next checkpoint"""
+        self._check_writable()
+        return await self._offload(self._delete_ids, ids)
+    
+    def _delete_ids(self, ids: List[int]) -> int:
+        with self._index_lock:
+            rows = self._metadata.rows_for_ids(ids)
+            rows = rows[self._metadata.live_mask()[rows]]
+            self._delete_rows(rows)
+            
+            if self._wal is not None:
+                self._pending += len(rows)
+            elif self._persist_path:
+                self._save()
+            else:
+                self._compact_if_sparse()
         
-        results = []
-        for idx, score in zip(indices[0], similarities):
-            if score >= self._score_threshold:
-                content = self._contents[idx]
-                if content.metadata is None:
-                    content.metadata = {}
-                content.metadata["similarity_score"] = float(score)
-                results.append(content)
+        return len(rows)
+    
+    async def query(self, query: str, where: Optional[MemoryFilter] = None) -> List[MemoryContent]:
+        return (await self.query_many([query], where=where))[0]
+    
+    async def query_many(
+        self,
+        queries: List[str],
+        k: Optional[int] = None,
+        where: Optional[MemoryFilter] = None
+    ) -> List[List[MemoryContent]]:
+        """Embed all queries in one batch and search them together; returns one result list per query"""
+        if not queries:
+            return []
+        if self._read_only:
+            await self._offload(self._locked_follow)
+        if len(self._metadata) == 0 and len(self._local_metadata) == 0:
+            return [[] for _ in queries]
         
-        return results
+        query_embeddings = await self._embed(queries)
+        return await self._search(query_embeddings, k or self._k, where)
     
     async def clear(self) -> None:
-        self._index.reset()
-        self._contents.clear()
-        
-        if self._persist_path and os.path.exists(self._persist_path):
-            os.remove(self._persist_path)
-            metadata_path = f"{self._persist_path}.meta"
-            if os.path.exists(metadata_path):
-                os.remove(metadata_path)
+        self._check_writable()
+        await self._offload(self._clear)
+    
+    def _clear(self) -> None:
+        with self._index_lock:
+            self._index = None
+            self._compactions += 1
+            self._mapped = False
+            self._delta = None
+            self._metadata.clear()
+            if self._exact is not None:
+                self._exact.clear()
+            self._pending = 0
+            
+            if self._wal is not None:
+                self._wal.remove()
+            
+            if self._persist_path and os.path.exists(self._persist_path):
+                os.remove(self._persist_path)
+                metadata_path = f"{self._persist_path}.meta"
+                if os.path.exists(metadata_path):
+                    os.remove(metadata_path)
     
     async def close(self) -> None:
-        if self._persist_path:
-            self._save()
+        await self._offload(self._close_files)
+        if self._lock_file is not None:
+            # Closing the descriptor releases the flock
+            self._lock_file.close()
+            self._lock_file = None
+    
+    def _close_files(self) -> None:
+        with self._index_lock:
+            if self._persist_path and not self._read_only:
+                self._save()
+            self._metadata.close()
+            if self._exact is not None:
+                self._exact.close()
+            if self._wal is not None:
+                self._wal.close()
     
     async def update_context(self, model_context: Any) -> None:
         pass
     
+    async def checkpoint(self) -> None:
+        """Write a full snapshot of the index, dropping deleted or expired rows and folding the write-ahead log into it"""
+        self._check_writable()
+        await self._offload(self._checkpoint)
+    
+    def _checkpoint(self) -> None:
+        with self._index_lock:
+            if self._persist_path:
+                self._save()
+            else:
+                self._compact()
+    
+    @property
+    def embedding_cache(self) -> EmbeddingCache:
+        return self._embedding_cache
+    
+    @property
+    def read_only(self) -> bool:
+        """True when another process holds the writer lock on the persisted files"""
+        return self._read_only
+    
+    async def _embed(self, texts: List[str]) -> np.ndarray:
+        if self._executor is None:
+            embeddings = self._embedding_cache.encode(self._encoder, self._embedding_model, texts)
+        else:
+            # Cache bookkeeping stays on the loop thread; only the model runs in the pool
+            keys, found, missing = self._embedding_cache.lookup(self._embedding_model, texts)
+            if missing:
+                encoded = await self._executor.encode(self._encoder, list(missing.values()))
+                found.update(self._embedding_cache.store(list(missing.keys()), encoded))
+            embeddings = self._embedding_cache.assemble(keys, found)
+        
+        faiss.normalize_L2(embeddings)
+        return embeddings
+    
+    async def _offload(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._executor is None:
+            return await asyncio.to_thread(fn, *args)
+        return await self._executor.run(fn, *args)
+    
+    async def _search(self, embeddings: np.ndarray, k: int, where: Optional[MemoryFilter] = None) -> List[List[MemoryContent]]:
+        # Adds now mutate the index on worker threads, so searches take the lock there too
+        return await self._offload(self._locked_search, embeddings, k, where)
+    
+    def _locked_search(self, embeddings: np.ndarray, k: int, where: Optional[MemoryFilter] = None) -> List[List[MemoryContent]]:
+        with self._index_lock:
+            results = self._search_contents(embeddings, k, where)
+            if len(self._local_metadata):
+                for merged, local in zip(results, self._search_local(embeddings, k, where)):
+                    merged.extend(local)
+                    merged.sort(key=lambda content: content.metadata["similarity_score"], reverse=True)
+                    del merged[k:]
+            return results
+    
+    def _search_local(self, embeddings: np.ndarray, k: int, where: Optional[MemoryFilter] = None) -> List[List[MemoryContent]]:
+        """Exact search over rows added here but not yet merged by the writer"""
+        live = self._local_metadata.live_mask()
+        if where is not None:
+            live &= where.mask(self._local_metadata.records)
+        similarities = embeddings @ self._local_vectors.T
+        similarities[:, ~live] = -np.inf
+        
+        results = []
+        for query_similarities in similarities:
+            query_results = []
+            for row in np.argsort(-query_similarities, kind="stable")[:k]:
+                score = float(query_similarities[row])
+                if score < self._score_threshold:
+                    break
+                content = self._local_metadata.get(int(row))
+                if where is not None and not where.matches(content):
+                    continue
+                # The writer has not assigned it an id yet
+                del content.metadata["memory_id"]
+                content.metadata["similarity_score"] = score
+                query_results.append(content)
+            results.append(query_results)
+        return results
+    
+    def _search_contents(self, embeddings: np.ndarray, k: int, where: Optional[MemoryFilter] = None) -> List[List[MemoryContent]]:
+        # Rows are resolved to contents inside the lock because compaction renumbers them
+        live = self._metadata.live_mask()
+        if where is not None:
+            # Filtering inside the search keeps k results instead of trimming k after it
+            live &= where.mask(self._metadata.records)
+        live_count = int(live.sum())
+        if live_count == 0:
+            return [[] for _ in range(len(embeddings))]
+        
+        k = min(k, live_count)
+        if self._exact is None:
+            distances, indices = self._search_index(embeddings, k, None if live_count == len(live) else live)
+        else:
+            candidates = min(k * self._rerank, live_count)
+            distances, indices = self._search_index(embeddings, candidates, None if live_count == len(live) else live)
+            distances, indices = self._rerank_exact(embeddings, distances, indices, k)
+        
+        similarities = 1 - (distances ** 2) / 2
+        
+        results = []
+        rows = []
+        for query_indices, query_similarities in zip(indices, similarities):
+            query_results = []
+            for idx, score in zip(query_indices, query_similarities):
+                # ANN indexes pad with -1 when fewer than k candidates are probed
+                if idx < 0:
+                    continue
+                if score >= self._score_threshold:
+                    content = self._metadata.get(int(idx))
+                    if where is not None and not where.matches(content):
+                        continue
+                    content.metadata["similarity_score"] = float(score)
+                    query_results.append(content)
+                    rows.append(int(idx))
+            results.append(query_results)
+        
+        self._metadata.touch(rows)
+        return results
+    
+    def _rerank_exact(self, embeddings: np.ndarray, distances: np.ndarray, indices: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        found = indices >= 0
+        exact = self._exact.get(np.where(found, indices, 0).ravel()).reshape(indices.shape + (-1,))
+        distances = np.where(found, ((exact - embeddings[:, None, :]) ** 2).sum(axis=2), np.inf)
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(indices, order, axis=1)
+    
+    def _search_index(self, embeddings: np.ndarray, k: int, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        base_count = self._index.ntotal
+        base_allowed = None if allowed is None else allowed[:base_count]
+        result = search_index(self._index, embeddings, k, base_allowed, self._nprobe, self._ef_search)
+        if self._delta is None or self._delta.ntotal == 0:
+            return result
+        
+        delta_allowed = None if allowed is None else allowed[base_count:]
+        delta_result = search_index(self._delta, embeddings, min(k, self._delta.ntotal), delta_allowed)
+        return merge_search(result, delta_result, base_count, k)
+    
+    def _writable_index(self, dimension: int) -> faiss.Index:
+        if self._mapped:
+            if self._delta is None:
+                self._delta = faiss.IndexFlatL2(dimension)
+            return self._delta
+        
+        if self._index is None:
+            self._index = faiss.IndexFlatL2(dimension)
+        return self._index
+    
+    def _append(self, embeddings: np.ndarray, contents: List[MemoryContent], ids: np.ndarray, expires_at: np.ndarray) -> None:
+        self._writable_index(embeddings.shape[1]).add(embeddings)
+        self._metadata.append_many(contents, ids, expires_at)
+        if self._exact is not None:
+            self._exact.append(embeddings)
+        self._next_id = max(self._next_id, int(ids[-1]) + 1)
+    
+    def _expiry(self, contents: List[MemoryContent], ttl: Optional[float]) -> np.ndarray:
+        # A "ttl" metadata key overrides the batch ttl; 0 means never expire
+        now = time.time()
+        default = ttl if ttl is not None else self._default_ttl
+        expires_at = np.zeros(len(contents), dtype="float64")
+        for i, content in enumerate(contents):
+            entry_ttl = (content.metadata or {}).get("ttl", default)
+            if entry_ttl:
+                expires_at[i] = now + float(entry_ttl)
+        return expires_at
+    
+    def _find_duplicates(self, embeddings: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Split a batch into positions to store and, for the rest, the row each one duplicates"""
+        duplicate_rows = np.full(len(embeddings), -1, dtype="int64")
+        
+        live = self._metadata.live_mask()
+        live_count = int(live.sum())
+        if live_count:
+            distances, indices = self._search_index(embeddings, 1, None if live_count == len(live) else live)
+            # Squared L2 between unit vectors is 2 - 2cos
+            similar = (indices[:, 0] >= 0) & (1 - distances[:, 0] / 2 >= threshold)
+            duplicate_rows[similar] = indices[similar, 0]
+        
+        # Repeats inside the batch fold into the first stored copy, whose row is known once it is appended
+        fresh: List[int] = []
+        similarities = embeddings @ embeddings.T
+        for i in np.flatnonzero(duplicate_rows < 0):
+            match = [j for j, f in enumerate(fresh) if similarities[i, f] >= threshold]
+            if match:
+                duplicate_rows[i] = len(self._metadata) + match[0]
+            else:
+                fresh.append(int(i))
+        
+        return np.array(fresh, dtype="int64"), duplicate_rows
+    
+    def _bump_rows(self, rows: np.ndarray, importance: np.ndarray) -> None:
+        timestamp = time.time()
+        rows, count, importance = self._metadata.bumped(rows, importance)
+        if self._wal is not None:
+            ids = np.array(self._metadata.records["id"][rows])
+            self._wal.append(("bump", self._seq + 1, ids, count, importance, timestamp))
+        self._seq += 1
+        self._metadata.set_bumped(rows, count, importance, timestamp)
+    
+    def _delete_rows(self, rows: np.ndarray) -> None:
+        if not len(rows):
+            return
+        
+        if self._wal is not None:
+            ids = np.array(self._metadata.records["id"][rows])
+            self._wal.append(("delete", self._seq + 1, ids))
+        self._seq += 1
+        self._metadata.mark_deleted(rows)
+    
+    def _evict_over_capacity(self) -> None:
+        if self._max_entries is None:
+            return
+        
+        live_rows = np.flatnonzero(self._metadata.live_mask())
+        excess = len(live_rows) - self._max_entries
+        if excess <= 0:
+            return
+        
+        victims = self._eviction_policy(np.array(self._metadata.records[live_rows]), excess)
+        self._delete_rows(live_rows[victims])
+    
+    def _compact_if_sparse(self) -> None:
+        # In-memory stores never checkpoint, so compact once most rows are dead
+        live = self._metadata.live_mask()
+        if len(live) - int(live.sum()) > len(live) // 2:
+            self._compact()
+    
+    def _compact(self) -> List[Tuple[str, str]]:
+        """Drop deleted and expired rows; returns (temp, final) paths still to be renamed into place"""
+        live = self._metadata.live_mask()
+        if self._index is None or live.all():
+            return []
+        
+        if self._mapped:
+            self._merge_delta()
+        
+        rows = np.flatnonzero(live)
+        self._compactions += 1
+        if self._exact is None:
+            rebuild_index(self._index, all_vectors(self._index)[rows])
+            return self._metadata.compact(rows, f".{self._generation}.tmp")
+        
+        # Re-encode from the exact copies rather than from lossy reconstructions
+        rebuild_index(self._index, self._exact.get(rows))
+        staged = self._metadata.compact(rows, f".{self._generation}.tmp")
+        return staged + self._exact.compact(rows, f".{self._generation}.tmp")
+    
+    @property
+    def index_type(self) -> str:
+        return "flat" if self._index is None else index_type_of(self._index)
+    
+    @property
+    def storage(self) -> str:
+        return "float32" if self._index is None else storage_of(self._index)
+    
+    def _promotion_due(self) -> bool:
+        if self._index is None or self._mapped:
+            return False
+        if self._index_type == "flat" and self._storage == "float32":
+            return False
+        # Anything but the initial uncompressed flat index has been built already
+        if self.index_type != "flat" or self.storage != "float32":
+            return False
+        # Small promote_at values wait until PQ has enough rows to train its codebooks
+        return self._index.ntotal >= max(self._promote_at, min_training_rows(self._index_type, self._storage))
+    
+    def _maybe_promote(self) -> bool:
+        if not self._promotion_due():
+            return False
+        self._index = self._build_promoted(all_vectors(self._index))
+        return True
+    
+    async def _promote(self) -> None:
+        await self._offload(self._promote_rows)
+    
+    def _promote_rows(self) -> None:
+        """Build the configured index from a snapshot of the flat one, then swap it in"""
+        with self._index_lock:
+            if self._promoting or not self._promotion_due():
+                return
+            self._promoting = True
+            vectors = all_vectors(self._index)
+            compactions = self._compactions
+        
+        try:
+            # Training and graph construction take seconds at promote_at rows; searches keep using the flat index meanwhile
+            index = self._build_promoted(vectors)
+            
+            with self._index_lock:
+                if self._compactions != compactions or not self._promotion_due():
+                    return
+                if self._index.ntotal > len(vectors):
+                    index.add(all_vectors(self._index)[len(vectors):])
+                self._index = index
+                if self._persist_path:
+                    self._save()
+        finally:
+            self._promoting = False
+    
+    def _build_promoted(self, vectors: np.ndarray) -> faiss.Index:
+        index = build_index(
+            self._index_type,
+            vectors,
+            nlist=self._nlist,
+            pq_m=self._pq_m,
+            hnsw_m=self._hnsw_m,
+            storage=self._storage
+        )
+        configure_search(index, nprobe=self._nprobe, ef_search=self._ef_search)
+        return index
+    
+    def _checkpoint_due(self) -> bool:
+        if self._pending >= self._checkpoint_every:
+            return True
+        return time.monotonic() - self._last_checkpoint >= self._checkpoint_interval
+    
     def _save(self) -> None:
         if not self._persist_path:
             return
+        merged = self._merge_inboxes()
+        if self._index is None:
+            return
+        
+        # Rewritten files go to temporary names listed in the .meta file, which
+        # is replaced atomically before they are renamed into place. _load redoes
+        # any rename a crash interrupted; a crash before the .meta replace leaves
+        # the previous checkpoint intact and the log replays on top of it.
+        self._metadata.flush()
+        if self._exact is not None:
+            self._exact.flush()
+        self._generation += 1
+        
+        staged = self._compact()
+        compacted = bool(staged)
         
-        faiss.write_index(self._index, self._persist_path)
+        # A mapped index with an empty delta is already exactly what is on disk
+        if compacted or not self._mapped or (self._delta is not None and self._delta.ntotal):
+            if self._mapped:
+                self._merge_delta()
+            
+            index_tmp = f"{self._persist_path}.{self._generation}.tmp"
+            faiss.write_index(self._index, index_tmp)
+            staged.append((index_tmp, self._persist_path))
         
         metadata_path = f"{self._persist_path}.meta"
-        with open(metadata_path, 'wb') as f:
-            pickle.dump(self._contents, f)
+        metadata_tmp = f"{metadata_path}.tmp"
+        with open(metadata_tmp, 'wb') as f:
+            pickle.dump({
+                "seq": self._seq,
+                "count": self._index.ntotal,
+                "next_id": self._next_id,
+                "generation": self._generation,
+                "staged": staged,
+                "inboxes": self._inbox_seqs
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        self._replace(metadata_tmp, metadata_path)
+        
+        self._apply_staged(staged)
+        if compacted:
+            self._metadata.reopen()
+            if self._exact is not None:
+                self._exact.reopen()
+        if self._mmap and staged:
+            self._map_index()
+        
+        # Merged rows are in the checkpoint now; a crash before this is harmless, as records up to the saved seqs are skipped
+        for path, end in merged:
+            WriteInbox.release(path, end)
+        
+        if self._wal is not None:
+            self._wal.reset()
+        self._pending = 0
+        self._last_checkpoint = time.monotonic()
     
     def _load(self) -> None:
-        if not self._persist_path or not os.path.exists(self._persist_path):
+        if not self._persist_path:
             return
         
-        self._index = faiss.read_index(self._persist_path)
-        
+        metadata = None
         metadata_path = f"{self._persist_path}.meta"
         if os.path.exists(metadata_path):
             with open(metadata_path, 'rb') as f:
-                self._contents = pickle.load(f)
+                metadata = pickle.load(f)
+            # Older snapshots pickled the MemoryContent objects themselves
+            if isinstance(metadata, list):
+                metadata = {"seq": 0, "contents": metadata}
+            
+            if metadata.get("staged"):
+                self._apply_staged(metadata["staged"])
+                self._metadata.reopen()
+                if self._exact is not None:
+                    self._exact.reopen()
+        
+        count = 0
+        needs_checkpoint = False
+        if os.path.exists(self._persist_path):
+            if self._mmap:
+                self._map_index()
+            else:
+                self._index = faiss.read_index(self._persist_path)
+            
+            if metadata is not None:
+                if "contents" in metadata:
+                    contents = metadata["contents"]
+                    self._metadata.clear()
+                    self._metadata.append_many(
+                        contents,
+                        np.arange(len(contents), dtype="uint64"),
+                        np.zeros(len(contents), dtype="float64")
+                    )
+                    metadata["count"] = len(contents)
+                    needs_checkpoint = True
+                count = metadata["count"]
+                self._seq = metadata["seq"]
+                self._generation = metadata.get("generation", 0)
+                self._next_id = metadata.get("next_id", 0)
+                self._inbox_seqs = metadata.get("inboxes", {})
+            
+            count = min(count, len(self._metadata), self._index.ntotal)
+            if self._index.ntotal > count:
+                if self._mapped:
+                    self._index = faiss.read_index(self._persist_path)
+                    self._mapped = False
+                    needs_checkpoint = True
+                truncate_index(self._index, count)
+        
+        self._metadata.truncate(count)
+        if self._exact is not None:
+            self._exact.truncate(count)
+            if len(self._exact) < count:
+                # Re-ranking was switched on for an existing store; copy what the index holds
+                self._exact.append(all_vectors(self._index)[len(self._exact):count])
+        if count:
+            self._next_id = max(self._next_id, int(self._metadata.records["id"].max()) + 1)
+        
+        if self._wal is not None:
+            for record in self._wal.replay():
+                self._replay(record)
+        
+        self._maybe_promote()
+        
+        # Rows read-only processes queued while no writer was running
+        if glob.glob(f"{glob.escape(self._persist_path)}.inbox.*"):
+            needs_checkpoint = True
+        
+        if needs_checkpoint:
+            self._save()
+    
+    def _replay(self, record: tuple) -> None:
+        op, seq = record[0], record[1]
+        if seq <= self._seq:
+            return
+        
+        if op == "add":
+            _, _, embeddings, contents, ids, expires_at = record
+            self._append(embeddings, contents, ids, expires_at)
+            self._pending += len(contents)
+        elif op == "bump":
+            _, _, ids, count, importance, timestamp = record
+            rows = np.searchsorted(self._metadata.records["id"], ids)
+            self._metadata.set_bumped(rows, count, importance, timestamp)
+            self._pending += len(rows)
+        else:
+            rows = self._metadata.rows_for_ids(record[2])
+            self._metadata.mark_deleted(rows)
+            self._pending += len(rows)
+        self._seq = seq
+    
+    def _lock_writer(self) -> bool:
+        # A separate lock file, because checkpoints rename new .rec/.text/index files over the old ones
+        self._lock_file = open(f"{self._persist_path}.lock", "ab")
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+        return True
+    
+    def _check_writable(self) -> None:
+        if self._read_only:
+            raise RuntimeError(f"{self._persist_path} is read-only here: another process holds its writer lock")
+    
+    def _checkpoint_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(f"{self._persist_path}.meta")
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+    
+    def _locked_follow(self) -> None:
+        with self._index_lock:
+            self._follow()
+    
+    def _follow(self) -> None:
+        """Remap the writer's latest checkpoint if it has published a new one since the last call"""
+        for _ in range(3):
+            stamp = self._checkpoint_stamp()
+            if stamp is None or stamp == self._followed:
+                return
+            
+            with open(f"{self._persist_path}.meta", "rb") as f:
+                metadata = pickle.load(f)
+            # Old snapshot layouts are upgraded by the writer; leftover temp files mean it is mid-checkpoint
+            if not isinstance(metadata, dict) or any(os.path.exists(tmp_path) for tmp_path, _ in metadata.get("staged", [])):
+                return
+            
+            self._metadata.reopen()
+            if self._exact is not None:
+                self._exact.reopen()
+            if self._mmap:
+                self._map_index()
+            else:
+                self._index = faiss.read_index(self._persist_path)
+                configure_search(self._index, nprobe=self._nprobe, ef_search=self._ef_search)
+            
+            # The writer appends past its checkpoint; only rows the mapped index holds are visible
+            count = min(metadata["count"], len(self._metadata), self._index.ntotal)
+            self._metadata.truncate(count)
+            if self._exact is not None:
+                self._exact.truncate(count)
+            self._seq = metadata["seq"]
+            self._generation = metadata.get("generation", 0)
+            self._next_id = metadata.get("next_id", 0)
+            self._drop_merged(metadata.get("inboxes", {}).get(self._inbox_name, 0))
+            
+            # A checkpoint that landed while remapping may have renamed files underneath; go again
+            if self._checkpoint_stamp() == stamp:
+                self._followed = stamp
+                return
+    
+    def _drop_merged(self, merged_seq: int) -> None:
+        """Forget local rows the writer has merged into the checkpoint just mapped"""
+        keep = np.flatnonzero(self._local_seqs > merged_seq)
+        if len(keep) == len(self._local_seqs):
+            return
+        self._local_metadata.compact(keep)
+        self._local_vectors = self._local_vectors[keep]
+        self._local_seqs = self._local_seqs[keep]
+    
+    def _merge_inboxes(self) -> List[Tuple[str, int]]:
+        """Add the rows read-only processes logged to their inboxes; returns (path, end) to release once checkpointed"""
+        prefix = f"{self._persist_path}.inbox."
+        merged = []
+        for path in glob.glob(f"{glob.escape(prefix)}*"):
+            if path.endswith(".tmp"):
+                continue
+            name = path[len(prefix):]
+            try:
+                records, end = WriteInbox.read(path)
+            except FileNotFoundError:
+                continue
+            
+            merged_seq = self._inbox_seqs.get(name, 0)
+            for seq, embeddings, contents, expires_at in records:
+                if seq > merged_seq:
+                    self._insert_rows(embeddings, contents, expires_at, self._dedup_threshold)
+                    merged_seq = seq
+            self._inbox_seqs[name] = merged_seq
+            merged.append((path, end))
+        
+        if merged:
+            self._evict_over_capacity()
+        return merged
+    
+    def _apply_staged(self, staged: List[Tuple[str, str]]) -> None:
+        for tmp_path, path in staged:
+            if os.path.exists(tmp_path):
+                self._replace(tmp_path, path)
+    
+    def _map_index(self) -> None:
+        self._index = read_index_mmap(self._persist_path)
+        self._mapped = True
+        self._delta = None
+        configure_search(self._index, nprobe=self._nprobe, ef_search=self._ef_search)
+    
+    def _merge_delta(self) -> None:
+        # A mapped index cannot grow in place, so merge into a private heap copy
+        merged = faiss.read_index(self._persist_path)
+        if self._delta is not None and self._delta.ntotal:
+            merged.add(all_vectors(self._delta))
+        self._index = merged
+        self._mapped = False
+        self._delta = None
+        self._maybe_promote()
+    
+    @staticmethod
+    def _replace(tmp_path: str, path: str) -> None:
+        os.replace(tmp_path, path)
+        directory = os.path.dirname(os.path.abspath(path))
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
     
     def __len__(self) -> int:
-        return len(self._contents)
\ No newline at end of file
+        return int(self._metadata.live_mask().sum()) + int(self._local_metadata.live_mask().sum())
\ No newline at end of file
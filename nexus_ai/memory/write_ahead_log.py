@@ -0,0 +1,127 @@
+from typing import Any, Iterator, List, Optional, Tuple
+import fcntl
+import os
+import pickle
+import struct
+import zlib
+
+_HEADER = struct.Struct("<QI")
+
+
+class WriteAheadLog:
+    """Append-only log of pickled records, each framed by length and CRC32."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+    
+    def append(self, record: Any) -> None:
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        
+        self._file.write(_HEADER.pack(len(payload), zlib.crc32(payload)))
+        self._file.write(payload)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def replay(self) -> Iterator[Any]:
+        if not os.path.exists(self.path):
+            return
+        
+        valid_end = 0
+        with open(self.path, "rb") as f:
+            while True:
+                record, end = self._read_record(f)
+                if record is None:
+                    break
+                valid_end = end
+                yield record
+        
+        # A crash mid-append leaves a torn tail; drop it so later appends stay readable
+        if os.path.getsize(self.path) > valid_end:
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_end)
+    
+    def reset(self) -> None:
+        self.close()
+        with open(self.path, "wb") as f:
+            os.fsync(f.fileno())
+    
+    def remove(self) -> None:
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    @staticmethod
+    def _read_record(f) -> Tuple[Optional[Any], int]:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return None, 0
+        
+        length, checksum = _HEADER.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return None, 0
+        
+        return pickle.loads(payload), f.tell()
+
+
+class WriteInbox:
+    """Log a read-only process appends new rows to for the writer to merge.
+    Both sides hold an flock on the file; the writer replaces or removes it
+    once merged, so an appender that locked a file no longer linked retries."""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def append(self, record: Any) -> None:
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        while True:
+            with open(self.path, "ab") as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                if os.fstat(f.fileno()).st_nlink == 0:
+                    continue
+                f.write(_HEADER.pack(len(payload), zlib.crc32(payload)))
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+                return
+    
+    @staticmethod
+    def read(path: str) -> Tuple[List[Any], int]:
+        """Every complete record in the inbox at `path`, and the offset they end at"""
+        records: List[Any] = []
+        end = 0
+        with open(path, "rb") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+            while True:
+                record, record_end = WriteAheadLog._read_record(f)
+                if record is None:
+                    return records, end
+                records.append(record)
+                end = record_end
+    
+    @staticmethod
+    def release(path: str, end: int) -> None:
+        """Drop the first `end` bytes, merged and checkpointed by the writer"""
+        with open(path, "rb") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            f.seek(end)
+            rest = f.read()
+            if not rest:
+                os.remove(path)
+                return
+            
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as tmp:
+                tmp.write(rest)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, path)
\ No newline at end of file
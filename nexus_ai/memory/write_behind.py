@@ -0,0 +1,67 @@
+from typing import Awaitable, Callable, Generic, List, Optional, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+
+class WriteBehindQueue(Generic[T]):
+    """Bounded queue of pending writes, drained in batches by one background task.
+    put() waits while the queue is full, so producers slow to the rate the stores absorb."""
+    
+    def __init__(self, apply: Callable[[List[T]], Awaitable[None]], max_pending: int = 1000, max_batch: int = 64):
+        self._apply = apply
+        self._max_pending = max_pending
+        self._max_batch = max_batch
+        self._queue: Optional["asyncio.Queue[T]"] = None
+        self._consumer: Optional["asyncio.Task[None]"] = None
+        self._error: Optional[BaseException] = None
+    
+    async def put(self, item: T) -> None:
+        if self._consumer is None:
+            # Started on first use, inside the event loop that will run it
+            self._queue = asyncio.Queue(self._max_pending)
+            self._consumer = asyncio.create_task(self._run())
+        await self._queue.put(item)
+    
+    async def flush(self) -> None:
+        """Wait until every queued write is applied; re-raises the first failure since the last flush"""
+        if self._queue is not None:
+            await self._queue.join()
+        
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+    
+    async def close(self) -> None:
+        try:
+            await self.flush()
+        finally:
+            if self._consumer is not None:
+                self._consumer.cancel()
+                try:
+                    await self._consumer
+                except asyncio.CancelledError:
+                    pass
+                self._consumer = None
+                self._queue = None
+    
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self._max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            
+            try:
+                await self._apply(batch)
+            except Exception as e:
+                # Keep draining; the failure surfaces on the next flush()
+                self._error = self._error or e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
\ No newline at end of file
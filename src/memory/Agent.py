@@ -83,6 +83,8 @@ async def extract_and_save_facts(
         
         user_facts = 0
         conversation_facts = 0
+        vector_facts = []
+        long_term_facts = []
         
         for line in facts_text.strip().split('\n'):
             line = line.strip()
@@ -103,16 +105,16 @@ async def extract_and_save_facts(
             is_user_fact = category in ["profile", "goals", "preferences", "interests", "skills"]
             memory_type = "semantic" if is_user_fact else "episodic"
             
-            await memory_system.long_term.add(
+            long_term_facts.append((
                 MemoryContent(
                     content=fact,
                     mime_type=MemoryMimeType.TEXT
                 ),
-                memory_type=memory_type,
-                importance=importance
-            )
+                memory_type,
+                importance
+            ))
         
-            await memory_system.vector.add(
+            vector_facts.append(
                 MemoryContent(
                     content=fact,
                     mime_type=MemoryMimeType.TEXT,
@@ -125,6 +127,10 @@ async def extract_and_save_facts(
             else:
                 conversation_facts += 1
         
+        # One transaction for the whole turn's facts
+        await memory_system.long_term.add_many(long_term_facts)
+        await memory_system.vector.add_many(vector_facts)
+        
         return {"user_facts": user_facts, "conversation_context": conversation_facts}
         
     except Exception as e:
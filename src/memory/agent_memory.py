@@ -32,6 +32,22 @@ class AgentMemorySystem(Memory):
             memory_type = content.metadata.get("type", "episodic") if content.metadata else "episodic"
             await self.long_term.add(content, memory_type=memory_type, importance=importance)
     
+    async def add_many(self, contents: List[MemoryContent], store_long_term: bool = False) -> None:
+        if not contents:
+            return
+        
+        for content in contents:
+            await self.session.add(content)
+        await self.vector.add_many(contents)
+        
+        if store_long_term:
+            items = []
+            for content in contents:
+                importance = content.metadata.get("importance", 0) if content.metadata else 0
+                memory_type = content.metadata.get("type", "episodic") if content.metadata else "episodic"
+                items.append((content, memory_type, importance))
+            await self.long_term.add_many(items)
+    
     async def query(self, query: str) -> List[MemoryContent]:
         
         vector_results = await self.vector.query(query)
@@ -97,14 +113,12 @@ class AgentMemorySystem(Memory):
     
     async def update_context(self, model_context: Any) -> None:
         memory_parts = []
-        session_memories = await self.session.query("")
-        if session_memories:
-            recent = session_memories[-5:]
-            if recent:
-                session_text = "Recent conversation:\n"
-                for i, mem in enumerate(recent, 1):
-                    session_text += f"{i}. {mem.content}\n"
-                memory_parts.append(session_text)
+        recent = self.session.get_recent(n=5)
+        if recent:
+            session_text = "Recent conversation:\n"
+            for i, mem in enumerate(recent, 1):
+                session_text += f"{i}. {mem.content}\n"
+            memory_parts.append(session_text)
         
         important = await self.long_term.get_important_memories(min_importance=7, limit=5)
         if important:
@@ -0,0 +1,48 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+import threading
+from sentence_transformers import SentenceTransformer
+
+class SharedEncoder:
+    """Process-wide handle to one SentenceTransformer, loaded on first use"""
+    
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model: Optional[SentenceTransformer] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+    
+    def load(self) -> SentenceTransformer:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+    
+    def encode(self, texts: List[str], **kwargs: Any) -> Any:
+        return self.load().encode(texts, **kwargs)
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.load().get_sentence_embedding_dimension()
+
+
+_encoders: Dict[str, SharedEncoder] = {}
+_registry_lock = threading.Lock()
+
+
+def get_encoder(model_name: str) -> SharedEncoder:
+    with _registry_lock:
+        encoder = _encoders.get(model_name)
+        if encoder is None:
+            encoder = SharedEncoder(model_name)
+            _encoders[model_name] = encoder
+        return encoder
+
+
+def warm_up(model_name: str) -> asyncio.Task:
+    """Start loading a model in the background so the first query does not pay for it"""
+    loop = asyncio.get_running_loop()
+    return loop.create_task(asyncio.to_thread(get_encoder(model_name).load))
\ No newline at end of file
@@ -1,16 +1,25 @@
 import sqlite3
 import json
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 from autogen_core.memory import Memory, MemoryContent, MemoryMimeType
 
 class LongTermMemory(Memory):
     def __init__(self, db_path: str = "long_term_memory.db"):
         self.db_path = db_path
+        self._conn = self._connect()
         self._init_db()
     
+    def _connect(self) -> sqlite3.Connection:
+        # One connection for the lifetime of the store. In WAL mode readers are not
+        # blocked by a writer, and synchronous=NORMAL only fsyncs at checkpoints:
+        # a power loss may drop the last commits but never corrupts the database
+        conn = sqlite3.connect(self.db_path, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
     def _init_db(self) -> None:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
         
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS memories (
@@ -34,8 +43,7 @@ class LongTermMemory(Memory):
             ON memories(importance DESC)
         """)
         
-        conn.commit()
-        conn.close()
+        self._conn.commit()
     
     async def add(
         self,
@@ -43,24 +51,29 @@ class LongTermMemory(Memory):
         memory_type: str = "episodic",
         importance: int = 0
     ) -> None:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        metadata_json = json.dumps(content.metadata) if content.metadata else None
-        
-        cursor.execute("""
-            INSERT INTO memories (content, memory_type, mime_type, metadata, importance)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            content.content,
-            memory_type,
-            content.mime_type.value if isinstance(content.mime_type, MemoryMimeType) else content.mime_type,
-            metadata_json,
-            importance
-        ))
-        
-        conn.commit()
-        conn.close()
+        await self.add_many([(content, memory_type, importance)])
+    
+    async def add_many(self, items: Sequence[Tuple[MemoryContent, str, int]]) -> None:
+        """Add (content, memory_type, importance) items in one transaction"""
+        if not items:
+            return
+        
+        rows = [
+            (
+                content.content,
+                memory_type,
+                content.mime_type.value if isinstance(content.mime_type, MemoryMimeType) else content.mime_type,
+                json.dumps(content.metadata) if content.metadata else None,
+                importance
+            )
+            for content, memory_type, importance in items
+        ]
+        
+        with self._conn:
+            self._conn.executemany("""
+                INSERT INTO memories (content, memory_type, mime_type, metadata, importance)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
     
     async def query(
         self,
@@ -68,8 +81,7 @@ class LongTermMemory(Memory):
         memory_type: Optional[str] = None,
         limit: int = 10
     ) -> List[MemoryContent]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
         
         sql = """
             SELECT content, mime_type, metadata
@@ -87,7 +99,6 @@ class LongTermMemory(Memory):
         
         cursor.execute(sql, params)
         rows = cursor.fetchall()
-        conn.close()
         
         results = []
         for content, mime_type, metadata_json in rows:
@@ -105,8 +116,7 @@ class LongTermMemory(Memory):
         min_importance: int = 5,
         limit: int = 20
     ) -> List[MemoryContent]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
         
         cursor.execute("""
             SELECT content, mime_type, metadata
@@ -117,7 +127,6 @@ class LongTermMemory(Memory):
         """, (min_importance, limit))
         
         rows = cursor.fetchall()
-        conn.close()
         
         results = []
         for content, mime_type, metadata_json in rows:
@@ -131,21 +140,18 @@ class LongTermMemory(Memory):
         return results
     
     async def clear(self) -> None:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
         cursor.execute("DELETE FROM memories")
-        conn.commit()
-        conn.close()
+        self._conn.commit()
     
     async def close(self) -> None:
-        pass
+        self._conn.close()
     
     async def update_context(self, model_context: Any) -> None:
         pass
     
     def get_stats(self) -> Dict[str, Any]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
         
         cursor.execute("SELECT COUNT(*) FROM memories")
         total = cursor.fetchone()[0]
@@ -157,7 +163,6 @@ class LongTermMemory(Memory):
         semantic = cursor.fetchone()[0]
         
     
-        conn.close()
         
         return {
             "total_memories": total,
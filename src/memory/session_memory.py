@@ -1,29 +1,40 @@
-from typing import List, Any
+from typing import Callable, Deque, List, Any
+from collections import deque
+from itertools import islice
 from autogen_core.memory import Memory, MemoryContent
 from datetime import datetime
 
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for English text under common BPE tokenizers
+    return max(1, (len(text) + 3) // 4)
+
+
 class SessionMemory(Memory):
     
-    def __init__(self, max_turns: int = 50):
+    def __init__(self, max_turns: int = 50, count_tokens: Callable[[str], int] = estimate_tokens):
         
-        self._memory: List[MemoryContent] = []
+        # Fixed-capacity ring buffers: appending past max_turns drops the oldest turn in O(1)
+        self._memory: Deque[MemoryContent] = deque(maxlen=max_turns)
+        self._tokens: Deque[int] = deque(maxlen=max_turns)
         self._max_turns = max_turns
-        
+        self._count_tokens = count_tokens
+    
     async def add(self, content: MemoryContent) -> None:
         if content.metadata is None:
             content.metadata = {}
         content.metadata["timestamp"] = datetime.now().isoformat()
         
         self._memory.append(content)
-        
-        if len(self._memory) > self._max_turns:
-            self._memory = self._memory[-self._max_turns:]
+        # Measured once here so get_window never re-tokenizes a turn
+        self._tokens.append(self._count_tokens(str(content.content)))
     
     async def query(self, query: str) -> List[MemoryContent]:
-        return self._memory.copy()
+        return list(self._memory)
     
     async def clear(self) -> None:
         self._memory.clear()
+        self._tokens.clear()
     
     async def close(self) -> None:
         pass
@@ -32,7 +43,21 @@ class SessionMemory(Memory):
         pass
     
     def get_recent(self, n: int = 5) -> List[MemoryContent]:
-        return self._memory[-n:] if n < len(self._memory) else self._memory.copy()
+        recent = list(islice(reversed(self._memory), max(n, 0)))
+        recent.reverse()
+        return recent
+    
+    def get_window(self, max_tokens: int) -> List[MemoryContent]:
+        """Newest turns, oldest first, whose combined token counts fit within `max_tokens`"""
+        window = []
+        used = 0
+        for content, tokens in zip(reversed(self._memory), reversed(self._tokens)):
+            if used + tokens > max_tokens:
+                break
+            used += tokens
+            window.append(content)
+        window.reverse()
+        return window
     
     def __len__(self) -> int:
         return len(self._memory)
\ No newline at end of file
@@ -1,7 +1,7 @@
 from typing import List, Optional, Any
 import faiss
 from autogen_core.memory import Memory, MemoryContent
-from sentence_transformers import SentenceTransformer
+from .encoder_registry import get_encoder
 import pickle
 import os
 
@@ -14,14 +14,13 @@ class FAISSVectorMemory(Memory):
         score_threshold: float = 0.3,
         persist_path: Optional[str] = None
     ):
-        self._encoder = SentenceTransformer(embedding_model)
+        self._encoder = get_encoder(embedding_model)
         self._k = k
         self._score_threshold = score_threshold
         self._persist_path = persist_path
         
-        self._dimension = self._encoder.get_sentence_embedding_dimension()
-        
-        self._index = faiss.IndexFlatL2(self._dimension)
+        # Created from the first embeddings seen, so construction never loads the model
+        self._index: Optional[faiss.Index] = None
         
         self._contents: List[MemoryContent] = []
         
@@ -29,14 +28,22 @@ class FAISSVectorMemory(Memory):
             self._load()
     
     async def add(self, content: MemoryContent) -> None:
-        text = content.content
-        embedding = self._encoder.encode([text], convert_to_numpy=True)
+        await self.add_many([content])
+    
+    async def add_many(self, contents: List[MemoryContent]) -> None:
+        if not contents:
+            return
+        
+        texts = [content.content for content in contents]
+        embeddings = self._encoder.encode(texts, convert_to_numpy=True)
         
-        faiss.normalize_L2(embedding)
+        faiss.normalize_L2(embeddings)
         
-        self._index.add(embedding)
+        if self._index is None:
+            self._index = faiss.IndexFlatL2(embeddings.shape[1])
+        self._index.add(embeddings)
         
-        self._contents.append(content)
+        self._contents.extend(contents)
         
         if self._persist_path:
             self._save()
@@ -65,7 +72,7 @@ class FAISSVectorMemory(Memory):
         return results
     
     async def clear(self) -> None:
-        self._index.reset()
+        self._index = None
         self._contents.clear()
         
         if self._persist_path and os.path.exists(self._persist_path):
@@ -82,7 +89,7 @@ class FAISSVectorMemory(Memory):
         pass
     
     def _save(self) -> None:
-        if not self._persist_path:
+        if not self._persist_path or self._index is None:
             return
         
         faiss.write_index(self._index, self._persist_path)